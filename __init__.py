@@ -3,7 +3,7 @@
 A Model Context Protocol server for querying Azure retail pricing information.
 """
 
-from .azure_pricing_server import main
+from .azure_pricing_server import main, run
 
 __version__ = "1.0.0"
-__all__ = ["main"]
\ No newline at end of file
+__all__ = ["main", "run"]
\ No newline at end of file
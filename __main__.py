@@ -3,8 +3,7 @@ Entry point for running the Azure Pricing MCP Server as a module.
 Usage: python -m azure_pricing_server
 """
 
-import asyncio
-from azure_pricing_server import main
+from azure_pricing_server import run
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
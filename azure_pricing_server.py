@@ -6,12 +6,24 @@ A Model Context Protocol server that provides tools for querying Azure retail pr
 """
 
 import asyncio
-import json
+import hashlib
+import heapq
 import logging
-from typing import Any, Dict, List, Optional, Union
+import math
+import os
+import random
+import time
+from collections import Counter, OrderedDict, defaultdict
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Set, Tuple, TypedDict, Union
 from urllib.parse import urlencode, quote
 
 import aiohttp
+import orjson
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.session import ServerSession
@@ -26,6 +38,11 @@ from mcp.types import (
 )
 from pydantic import BaseModel, Field
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,118 +50,780 @@ logger = logging.getLogger(__name__)
 # Azure Retail Prices API configuration
 AZURE_PRICING_BASE_URL = "https://prices.azure.com/api/retail/prices"
 DEFAULT_API_VERSION = "2023-01-01-preview"
+# Fixed query parameters are encoded once; USD is the common case
+AZURE_PRICING_URL = f"{AZURE_PRICING_BASE_URL}?api-version={DEFAULT_API_VERSION}"
+AZURE_PRICING_URL_USD = f"{AZURE_PRICING_URL}&currencyCode=USD"
 MAX_RESULTS_PER_REQUEST = 1000
+# Pages followed for one query (including the first), and how many are requested at once
+MAX_PAGES_PER_QUERY = 10
+PAGE_FETCH_BATCH = 4
+# Service suggestions shown when a service name does not match exactly
+MAX_SERVICE_SUGGESTIONS = 5
+
+class PriceItem(TypedDict, total=False):
+    """Price item fields used by the server, as returned by the Azure Retail Prices API.
+    
+    Items stay plain dicts so they can be returned to MCP clients as JSON. Extend
+    this when a feature needs additional fields; it also drives the $select projection.
+    """
+    serviceName: str
+    serviceFamily: str
+    productName: str
+    skuName: str
+    armSkuName: str
+    meterName: str
+    armRegionName: str
+    location: str
+    retailPrice: float
+    unitOfMeasure: str
+    type: str
+    savingsPlan: List[Dict[str, Any]]
+
+# Price item fields requested via $select
+PRICE_ITEM_FIELDS = tuple(PriceItem.__annotations__)
+PRICE_ITEM_SELECT = ",".join(PRICE_ITEM_FIELDS)
+
+class SkuEntry:
+    """SKU aggregated by discover_service_skus; slotted since large services yield many."""
+    __slots__ = ("sku_name", "arm_sku_name", "product_name", "regions", "min_price", "sample_unit")
+    
+    def __init__(self, sku_name: str, arm_sku_name: str, product_name: str, min_price: float, sample_unit: str):
+        self.sku_name = sku_name
+        self.arm_sku_name = arm_sku_name
+        self.product_name = product_name
+        self.regions: Union[Set[str], Tuple[str, ...]] = set()
+        self.min_price = min_price
+        self.sample_unit = sample_unit
+
+class FormattedPriceItem(TypedDict, total=False):
+    """Price item as rendered by the azure_price_search tool.
+    
+    The original_price/savings_* keys are only present when a discount was applied.
+    """
+    service: str
+    product: str
+    sku: str
+    region: str
+    location: str
+    discounted_price: float
+    unit: str
+    type: str
+    savings_plans: List[Dict[str, Any]]
+    original_price: float
+    savings_amount: float
+    savings_percentage: float
+
+# Response cache configuration
+CACHE_TTL_SECONDS = float(os.getenv("AZURE_PRICING_CACHE_TTL", "900"))  # 15 minutes
+# Empty results (mistyped SKUs, unknown services) expire sooner so new prices show up quickly
+CACHE_NEGATIVE_TTL_SECONDS = min(float(os.getenv("AZURE_PRICING_CACHE_NEGATIVE_TTL", "300")), CACHE_TTL_SECONDS)
+CACHE_MAX_ENTRIES = 2048
+# Hot entries are re-fetched in the background shortly before they expire
+CACHE_REFRESH_INTERVAL = float(os.getenv("AZURE_PRICING_CACHE_REFRESH_INTERVAL", "60"))
+CACHE_REFRESH_TOP_N = 50
+
+# Set while a background refresh runs so nested lookups skip cached entries
+_bypass_cache: ContextVar[bool] = ContextVar("_bypass_cache", default=False)
+# Set by cached_call while fetching; marked when the fetch depends on an empty API
+# response, so values derived from it (such as tool output) get the negative TTL too
+_negative_scope: ContextVar[Optional[List[bool]]] = ContextVar("_negative_scope", default=None)
+
+def _mark_negative() -> None:
+    """Flag the enclosing cached_call fetch, if any, as depending on an empty result."""
+    scope = _negative_scope.get()
+    if scope is not None:
+        scope[0] = True
+
+# Set by cached_call while fetching; holds the earliest expiry of the cache entries the
+# fetch read, so a value derived from them never outlives the responses it was built from
+_expiry_scope: ContextVar[Optional[List[float]]] = ContextVar("_expiry_scope", default=None)
+
+def _note_expiry(expires_at: float) -> None:
+    """Lower the enclosing cached_call fetch's expiry bound, if any, to `expires_at`."""
+    scope = _expiry_scope.get()
+    if scope is not None and expires_at < scope[0]:
+        scope[0] = expires_at
+
+def _is_empty_result(data: Any) -> bool:
+    """Whether a cached value is an API response page without any items."""
+    return isinstance(data, Mapping) and "Items" in data and not data["Items"]
+
+# Upper bound on concurrent requests to the Azure Retail Prices API
+MAX_CONCURRENT_REQUESTS = int(os.getenv("AZURE_PRICING_MAX_CONCURRENCY", "16"))
+# Sustained request rate (per second) to the API; 0 disables rate limiting
+MAX_REQUESTS_PER_SECOND = float(os.getenv("AZURE_PRICING_MAX_RPS", "0"))
+# Backoff for rate-limited (429) requests without a usable Retry-After header
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+# Total time allowed for a single Azure Retail Prices API request
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("AZURE_PRICING_REQUEST_TIMEOUT", "30"))
+
+# Common service name mappings
+_SERVICE_MAPPINGS: Mapping[str, str] = MappingProxyType({
+    # User input -> Correct Azure service name
+    "app service": "Azure App Service",
+    "web app": "Azure App Service",
+    "web apps": "Azure App Service",
+    "app services": "Azure App Service",
+    "websites": "Azure App Service",
+    "web service": "Azure App Service",
+    
+    "virtual machine": "Virtual Machines",
+    "vm": "Virtual Machines",
+    "vms": "Virtual Machines",
+    "compute": "Virtual Machines",
+    
+    "storage": "Storage",
+    "blob": "Storage",
+    "blob storage": "Storage",
+    "file storage": "Storage",
+    "disk": "Storage",
+    
+    "sql": "Azure SQL Database",
+    "sql database": "Azure SQL Database",
+    "database": "Azure SQL Database",
+    "sql server": "Azure SQL Database",
+    
+    "cosmos": "Azure Cosmos DB",
+    "cosmosdb": "Azure Cosmos DB",
+    "cosmos db": "Azure Cosmos DB",
+    "document db": "Azure Cosmos DB",
+    
+    "kubernetes": "Azure Kubernetes Service",
+    "aks": "Azure Kubernetes Service",
+    "k8s": "Azure Kubernetes Service",
+    "container service": "Azure Kubernetes Service",
+    
+    "functions": "Azure Functions",
+    "function app": "Azure Functions",
+    "serverless": "Azure Functions",
+    
+    "redis": "Azure Cache for Redis",
+    "cache": "Azure Cache for Redis",
+    
+    "ai": "Azure AI services",
+    "cognitive": "Azure AI services",
+    "cognitive services": "Azure AI services",
+    "openai": "Azure OpenAI",
+    
+    "networking": "Virtual Network",
+    "network": "Virtual Network",
+    "vnet": "Virtual Network",
+    
+    "load balancer": "Load Balancer",
+    "lb": "Load Balancer",
+    
+    "application gateway": "Application Gateway",
+    "app gateway": "Application Gateway",
+})
+
+def _pricing_url(currency_code: str) -> str:
+    """Return the pricing API URL with api-version and currency already encoded."""
+    if currency_code == "USD":
+        return AZURE_PRICING_URL_USD
+    return f"{AZURE_PRICING_URL}&currencyCode={quote(currency_code)}"
+
+def _odata_literal(value: str) -> str:
+    """Quote a value as an OData string literal, escaping embedded single quotes."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _odata_eq(field: str, value: Union[str, List[str]]) -> str:
+    """Build an OData equality condition; a list of values becomes a parenthesised OR group."""
+    if isinstance(value, list):
+        return "(" + " or ".join(f"{field} eq {_odata_literal(v)}" for v in value) + ")"
+    return f"{field} eq {_odata_literal(value)}"
+
+def _price_query_params(filter_conditions: List[str], limit: int) -> Dict[str, str]:
+    """Build the $select/$filter/$top query parameters for a price query."""
+    # api-version and currency are pre-encoded in the URL
+    params = {"$select": PRICE_ITEM_SELECT}
+    if filter_conditions:
+        params["$filter"] = " and ".join(filter_conditions)
+    # Always cap the page size server-side; without $top the API pages at 100 items
+    params["$top"] = str(min(limit, MAX_RESULTS_PER_REQUEST))
+    return params
+
+def _build_token_index(mappings: Mapping[str, str]) -> Dict[str, Set[str]]:
+    """Build an inverted index of mapping-key tokens to Azure service names."""
+    index: Dict[str, Set[str]] = {}
+    for user_term, azure_service in mappings.items():
+        for token in user_term.split():
+            index.setdefault(token, set()).add(azure_service)
+    return index
+
+# Token -> Azure service names, used for partial matching
+_TOKEN_INDEX = _build_token_index(_SERVICE_MAPPINGS)
+
+class _TrieNode:
+    """Node of the service-name trie."""
+    __slots__ = ("children", "service", "reachable")
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.service: Optional[str] = None  # Set when a complete term ends here
+        self.reachable: Set[str] = set()  # Services of all terms below this node
+
+def _build_service_trie(mappings: Mapping[str, str]) -> _TrieNode:
+    """Build a character trie over the mapping aliases and the canonical service names."""
+    terms = dict(mappings)
+    for azure_service in set(mappings.values()):
+        terms.setdefault(azure_service.lower(), azure_service)
+    
+    root = _TrieNode()
+    for term, azure_service in terms.items():
+        node = root
+        node.reachable.add(azure_service)
+        for char in term:
+            node = node.children.setdefault(char, _TrieNode())
+            node.reachable.add(azure_service)
+        node.service = azure_service
+    return root
+
+# Normalized aliases and service names -> Azure service name
+_SERVICE_TRIE = _build_service_trie(_SERVICE_MAPPINGS)
+
+def _substring_matches(term: str) -> Set[str]:
+    """Return the services whose mapping alias occurs in `term` or contains it."""
+    return {
+        azure_service for user_term, azure_service in _SERVICE_MAPPINGS.items()
+        if term in user_term or user_term in term
+    }
+
+def _char_ngrams(text: str, min_n: int = 2, max_n: int = 4) -> Counter:
+    """Count the character n-grams of each space-padded word in text."""
+    grams: Counter = Counter()
+    for word in text.lower().split():
+        padded = f" {word} "
+        for n in range(min_n, max_n + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+class _NgramIndex:
+    """Character n-gram TF-IDF index over service aliases for typo-tolerant lookups."""
+    __slots__ = ("services", "idf", "postings")
+    
+    def __init__(self, mappings: Mapping[str, str]):
+        terms = dict(mappings)
+        for azure_service in set(mappings.values()):
+            terms.setdefault(azure_service.lower(), azure_service)
+        
+        self.services: List[str] = list(terms.values())
+        term_grams = [_char_ngrams(term) for term in terms]
+        
+        document_frequency: Counter = Counter()
+        for grams in term_grams:
+            document_frequency.update(grams.keys())
+        total = len(term_grams)
+        self.idf: Dict[str, float] = {
+            gram: math.log((1 + total) / (1 + count)) + 1
+            for gram, count in document_frequency.items()
+        }
+        
+        # n-gram -> [(term index, L2-normalized tf-idf weight)]
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for index, grams in enumerate(term_grams):
+            weights = {gram: count * self.idf[gram] for gram, count in grams.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            for gram, weight in weights.items():
+                self.postings[gram].append((index, weight / norm))
+    
+    def rank(self, query: str, k: int = 5, min_score: float = 0.5) -> List[Tuple[str, float]]:
+        """Return up to k (service name, cosine score) pairs most similar to query."""
+        weights = {
+            gram: count * self.idf[gram]
+            for gram, count in _char_ngrams(query).items()
+            if gram in self.idf
+        }
+        if not weights:
+            return []
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        
+        scores: Dict[int, float] = defaultdict(float)
+        for gram, weight in weights.items():
+            for index, term_weight in self.postings[gram]:
+                scores[index] += weight / norm * term_weight
+        
+        # Keep the best-scoring alias per service
+        best: Dict[str, float] = {}
+        for index, score in scores.items():
+            service = self.services[index]
+            if score >= min_score and score > best.get(service, 0.0):
+                best[service] = score
+        return heapq.nlargest(k, best.items(), key=itemgetter(1))
+
+# Character n-gram TF-IDF index over aliases and service names
+_SERVICE_NGRAM_INDEX = _NgramIndex(_SERVICE_MAPPINGS)
+
+def _resolve_service_name(hint: str, min_prefix: int = 3) -> Optional[str]:
+    """Resolve a service hint to an Azure service name without querying the API.
+    
+    Matches a known alias or service name exactly in O(len(hint)), or a prefix of
+    at least `min_prefix` characters that leads to a single service and occurs in
+    no alias of another service (so "server" does not silently become "serverless").
+    Returns None otherwise.
+    """
+    term = " ".join(hint.lower().split())
+    node = _SERVICE_TRIE
+    for char in term:
+        node = node.children.get(char)
+        if node is None:
+            return None
+    if node.service is not None:
+        return node.service
+    if len(term) >= min_prefix and len(node.reachable | _substring_matches(term)) == 1:
+        return next(iter(node.reachable))
+    return None
+
+class _RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts of up to `rate`."""
+    
+    __slots__ = ("_rate", "_capacity", "_tokens", "_updated")
+    
+    def __init__(self, rate: float):
+        self._rate = rate
+        self._capacity = max(rate, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
 
 class AzurePricingServer:
     """Azure Pricing MCP Server implementation."""
     
+    __slots__ = (
+        "session", "_cache", "_inflight", "_cache_refreshers", "_cache_hits", "_etags", "_negative_keys",
+        "_semaphore", "_rate_limiter", "_refresh_task", "_warm_up_task"
+    )
+    
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
+        # Keyed by request digest (bytes) or, for memoized lookups and tool results, a tuple;
+        # kept in least-recently-used order for eviction
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Re-fetch callables and hit counts per cached entry, for background refresh
+        self._cache_refreshers: Dict[Hashable, Callable[[], Awaitable[Any]]] = {}
+        self._cache_hits: Counter = Counter()
+        # ETags of cached API responses, so refreshes can use conditional requests
+        self._etags: Dict[Hashable, str] = {}
+        # Entries cached with the shorter negative TTL
+        self._negative_keys: Set[Hashable] = set()
+        # Created in startup() so they bind to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[_RateLimiter] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._warm_up_task: Optional[asyncio.Task] = None
         
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession()
+        await self.startup()
+        # Open a pooled connection in the background so the first tool call
+        # does not pay for the TCP/TLS handshake
+        self._warm_up_task = asyncio.create_task(self._warm_up())
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self.session:
+        await self.shutdown()
+    
+    async def startup(self) -> None:
+        """Create the shared HTTP session. Safe to call more than once."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=32,
+                keepalive_timeout=120,
+                ttl_dns_cache=300
+            )
+            # aiohttp advertises gzip/deflate (and br when Brotli is installed)
+            # and transparently decompresses responses
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Accept": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS, sock_connect=5),
+                # The public pricing API sets no cookies worth tracking
+                cookie_jar=aiohttp.DummyCookieJar(),
+                auto_decompress=True
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        if self._rate_limiter is None and MAX_REQUESTS_PER_SECOND > 0:
+            self._rate_limiter = _RateLimiter(MAX_REQUESTS_PER_SECOND)
+        if self._refresh_task is None and CACHE_TTL_SECONDS > 0 and CACHE_REFRESH_INTERVAL > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def shutdown(self) -> None:
+        """Stop background tasks and close the shared HTTP session."""
+        for task in (self._refresh_task, self._warm_up_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_task = None
+        self._warm_up_task = None
+        if self.session is not None:
             await self.session.close()
+            self.session = None
+        self._semaphore = None
+    
+    async def _warm_up(self) -> None:
+        """Send a minimal query to establish a keep-alive connection to the API."""
+        try:
+            async with self._semaphore:
+                async with self.session.get(AZURE_PRICING_URL_USD, params={"$top": "1"}) as response:
+                    await response.read()
+        except Exception as e:
+            logger.debug("Connection warm-up failed: %s", e)
+    
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> bytes:
+        """Build a cache key from the URL and its sorted query parameters."""
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.blake2b(f"{url}?{query}".encode("utf-8"), digest_size=16).digest()
+    
+    def _cache_get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached response if present and not expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            self._cache_evict(key)
+            return None
+        self._cache_hits[key] += 1
+        self._cache.move_to_end(key)
+        if key in self._negative_keys:
+            _mark_negative()
+        _note_expiry(expires_at)
+        return data
+    
+    def _cache_set(self, key: Hashable, data: Any, negative: bool = False, not_after: float = math.inf) -> None:
+        """Store a response in the cache, evicting the least recently used entry when full.
+        
+        Negative (empty) results are kept for CACHE_NEGATIVE_TTL_SECONDS instead of the full TTL.
+        The entry never expires later than `not_after` (a time.monotonic() timestamp).
+        """
+        ttl = CACHE_NEGATIVE_TTL_SECONDS if negative else CACHE_TTL_SECONDS
+        if ttl <= 0:
+            self._cache_evict(key)
+            return
+        self._cache.pop(key, None)
+        while len(self._cache) >= CACHE_MAX_ENTRIES:
+            self._cache_evict(next(iter(self._cache)))
+        self._cache[key] = (min(time.monotonic() + ttl, not_after), data)
+        if negative:
+            self._negative_keys.add(key)
+        else:
+            self._negative_keys.discard(key)
+    
+    def _cache_evict(self, key: Hashable) -> None:
+        """Drop a cache entry along with its refresh bookkeeping."""
+        self._cache.pop(key, None)
+        self._cache_refreshers.pop(key, None)
+        self._cache_hits.pop(key, None)
+        self._etags.pop(key, None)
+        self._negative_keys.discard(key)
+    
+    @staticmethod
+    async def _scoped_fetch(fetch: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool, float]:
+        """Await `fetch()` in a fresh dependency scope.
+        
+        Returns the result, whether it depends on an empty API response, and the
+        earliest expiry of the cache entries it read.
+        """
+        scope = [False]
+        expiry = [math.inf]
+        token = _negative_scope.set(scope)
+        expiry_token = _expiry_scope.set(expiry)
+        try:
+            data = await fetch()
+        finally:
+            _expiry_scope.reset(expiry_token)
+            _negative_scope.reset(token)
+        return data, scope[0] or _is_empty_result(data), expiry[0]
+    
+    async def _refresh_loop(self) -> None:
+        """Periodically re-fetch the hottest cached entries before they expire.
+        
+        Every CACHE_REFRESH_INTERVAL seconds, the most-hit entries that would expire
+        before the next couple of cycles are refreshed, so frequent queries and tool
+        calls keep hitting a warm cache. Hit counts are halved each cycle to favour
+        recent use.
+        """
+        while True:
+            await asyncio.sleep(CACHE_REFRESH_INTERVAL)
+            refresh_before = time.monotonic() + 2 * CACHE_REFRESH_INTERVAL
+            expiring_keys = [
+                key for key, _ in self._cache_hits.most_common()
+                if key in self._cache_refreshers and self._cache[key][0] <= refresh_before
+            ][:CACHE_REFRESH_TOP_N]
+            
+            if expiring_keys:
+                results = await asyncio.gather(
+                    *(self._refresh_entry(key) for key in expiring_keys),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.warning("Background cache refresh failed: %s", result)
+            
+            for key in list(self._cache_hits):
+                self._cache_hits[key] //= 2
+                if not self._cache_hits[key]:
+                    del self._cache_hits[key]
+    
+    async def _refresh_entry(self, key: Hashable) -> None:
+        """Re-fetch a single cached entry and reset its expiry.
+        
+        Cache reads are bypassed while refreshing, so derived entries such as tool
+        results are rebuilt from fresh API responses rather than cached ones.
+        """
+        refresh = self._cache_refreshers[key]
+        token = _bypass_cache.set(True)
+        try:
+            data, negative, not_after = await self._scoped_fetch(refresh)
+        finally:
+            _bypass_cache.reset(token)
+        self._cache_set(key, data, negative, not_after)
+        if key in self._cache:
+            self._cache_refreshers[key] = refresh
+    
+    async def cached_call(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, awaiting `fetch()` and caching its result on a miss.
+        
+        Cached values are shared between callers and must be treated as read-only.
+        Concurrent misses for the same key are coalesced: the first caller fetches
+        and later callers await the same in-flight future. Values that depend on an
+        empty API response are cached with the shorter negative TTL, and no value
+        outlives the cached entries it was built from.
+        """
+        data = None if _bypass_cache.get() else self._cache_get(key)
+        if data is not None:
+            return data
+        
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                # Shield so a cancelled waiter does not cancel the shared fetch
+                data = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The fetching caller was cancelled, not us: take over the fetch
+                return await self.cached_call(key, fetch)
+            if key in self._negative_keys:
+                _mark_negative()
+            if key in self._cache:
+                _note_expiry(self._cache[key][0])
+            return data
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data, negative, not_after = await self._scoped_fetch(fetch)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so an unawaited failure is not logged twice
+            raise
+        else:
+            self._cache_set(key, data, negative, not_after)
+            if negative:
+                _mark_negative()
+            if key in self._cache:
+                _note_expiry(self._cache[key][0])
+                self._cache_refreshers[key] = fetch
+            future.set_result(data)
+        finally:
+            del self._inflight[key]
+        return data
     
     async def _make_request(self, url: str, params: Dict[str, Any] = None, max_retries: int = 3) -> Dict[str, Any]:
-        """Make HTTP request to Azure Pricing API with retry logic for rate limiting."""
-        if not self.session:
+        """Make HTTP request to Azure Pricing API, serving repeated queries from the TTL cache."""
+        key = self._cache_key(url, params)
+        return await self.cached_call(key, lambda: self._fetch(url, params, max_retries, key))
+    
+    @staticmethod
+    def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+        """Seconds to wait before retrying a rate-limited request.
+        
+        Honors a Retry-After header given in seconds or as an HTTP date, clamped to
+        RETRY_MAX_DELAY; otherwise backs off exponentially with jitter so concurrent
+        retries spread out.
+        """
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = math.nan  # Unparseable header: fall back to backoff
+            if math.isfinite(delay):
+                return min(max(delay, 0.0), RETRY_MAX_DELAY)
+        return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 1)
+    
+    async def _fetch(
+        self,
+        url: str,
+        params: Dict[str, Any] = None,
+        max_retries: int = 3,
+        cache_key: Optional[Hashable] = None
+    ) -> Dict[str, Any]:
+        """Make HTTP request to Azure Pricing API with retry logic for rate limiting.
+        
+        When `cache_key` still holds a cached response with a known ETag, the request
+        is made conditional and a 304 Not Modified returns the cached data.
+        """
+        if self.session is None or self.session.closed or self._semaphore is None:
+            # The session and its background tasks are owned by `async with` / startup()
             raise RuntimeError("HTTP session not initialized")
         
+        etag = self._etags.get(cache_key) if cache_key is not None else None
+        cached = self._cache.get(cache_key) if etag else None
+        headers = {"If-None-Match": etag} if cached is not None else None
         last_exception = None
         
         for attempt in range(max_retries + 1):  # 0, 1, 2, 3 (4 total attempts)
             try:
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 429:  # Too Many Requests
-                        if attempt < max_retries:
-                            wait_time = 5 * (attempt + 1)  # 5, 10, 15 seconds
-                            logger.warning(f"Rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries + 1})")
-                            await asyncio.sleep(wait_time)
-                            continue
+                # Bound concurrent upstream calls; released before any backoff sleep
+                async with self._semaphore:
+                    if self._rate_limiter is not None:
+                        await self._rate_limiter.acquire()
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        if response.status == 304 and cached is not None:  # Not Modified
+                            return cached[1]
+                        if response.status == 429 and attempt < max_retries:  # Too Many Requests
+                            wait_time = self._retry_delay(response.headers.get("Retry-After"), attempt)
                         else:
-                            # Last attempt failed, raise the error
+                            # Raises on the last rate-limited attempt as well
                             response.raise_for_status()
-                    
-                    response.raise_for_status()
-                    return await response.json()
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Response Content-Encoding: %s", response.headers.get("Content-Encoding", "identity"))
+                            etag = response.headers.get("ETag")
+                            if etag and cache_key is not None and CACHE_TTL_SECONDS > 0:
+                                self._etags[cache_key] = etag
+                            # orjson decodes large price pages much faster than stdlib json
+                            return orjson.loads(await response.read())
+                
+                logger.warning("Rate limited (429). Retrying in %s seconds... (attempt %d/%d)", wait_time, attempt + 1, max_retries + 1)
+                await asyncio.sleep(wait_time)
                     
             except aiohttp.ClientResponseError as e:
                 if e.status == 429 and attempt < max_retries:
-                    wait_time = 5 * (attempt + 1)
-                    logger.warning(f"Rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries + 1})")
+                    retry_after = e.headers.get("Retry-After") if e.headers else None
+                    wait_time = self._retry_delay(retry_after, attempt)
+                    logger.warning("Rate limited (429). Retrying in %s seconds... (attempt %d/%d)", wait_time, attempt + 1, max_retries + 1)
                     await asyncio.sleep(wait_time)
                     last_exception = e
                     continue
                 else:
-                    logger.error(f"HTTP request failed: {e}")
+                    logger.error("HTTP request failed: %s", e)
                     raise
+            except asyncio.TimeoutError:
+                logger.error("HTTP request timed out after %s seconds", REQUEST_TIMEOUT_SECONDS)
+                raise
             except aiohttp.ClientError as e:
-                logger.error(f"HTTP request failed: {e}")
+                logger.error("HTTP request failed: %s", e)
                 raise
             except Exception as e:
-                logger.error(f"Unexpected error during request: {e}")
+                logger.error("Unexpected error during request: %s", e)
                 raise
         
         # If we get here, all retries failed
         if last_exception:
             raise last_exception
     
+    async def _fetch_items(self, url: str, params: Dict[str, Any], limit: int) -> Tuple[List[PriceItem], bool]:
+        """Fetch up to `limit` price items, returning the items and whether more exist.
+        
+        The first page is fetched on its own; if the API reports a NextPageLink and
+        the limit calls for more, further pages are requested concurrently in batches
+        of PAGE_FETCH_BATCH using $skip offsets, up to MAX_PAGES_PER_QUERY pages in
+        total. Paging stops at the first short page or page without a NextPageLink.
+        """
+        data = await self._make_request(url, params)
+        # Copy so callers never mutate the cached response's list
+        items = list(data.get("Items", []))
+        has_more = bool(data.get("NextPageLink"))
+        page_size = len(items)
+        next_page = 1
+        
+        while has_more and page_size and len(items) < limit and next_page < MAX_PAGES_PER_QUERY:
+            pages_needed = math.ceil((limit - len(items)) / page_size)
+            batch = range(next_page, next_page + min(pages_needed, PAGE_FETCH_BATCH, MAX_PAGES_PER_QUERY - next_page))
+            pages = await asyncio.gather(
+                *(self._make_request(url, {**params, "$skip": str(page * page_size)}) for page in batch)
+            )
+            next_page = batch.stop
+            for page in pages:
+                page_items = page.get("Items", [])
+                items.extend(page_items)
+                has_more = bool(page.get("NextPageLink")) and len(page_items) == page_size
+                if not has_more:
+                    break
+        
+        # If we have more results than requested, truncate
+        if len(items) > limit:
+            items = items[:limit]
+            has_more = True
+        
+        return items, has_more
+    
     async def search_azure_prices(
         self,
-        service_name: Optional[str] = None,
+        service_name: Optional[Union[str, List[str]]] = None,
         service_family: Optional[str] = None,
-        region: Optional[str] = None,
+        region: Optional[Union[str, List[str]]] = None,
         sku_name: Optional[str] = None,
         price_type: Optional[str] = None,
         currency_code: str = "USD",
         limit: int = 50,
         discount_percentage: Optional[float] = None,
-        validate_sku: bool = True
+        validate_sku: bool = True,
+        sku_exact: bool = False
     ) -> Dict[str, Any]:
-        """Search Azure retail prices with various filters, SKU validation, and discount support."""
+        """Search Azure retail prices with various filters, SKU validation, and discount support.
+        
+        `service_name` and `region` may be lists, which are combined into a single OR filter.
+        `sku_exact` matches `sku_name` with `eq` instead of a partial `contains` match.
+        """
         
         # Build filter conditions
         filter_conditions = []
         
         if service_name:
-            filter_conditions.append(f"serviceName eq '{service_name}'")
+            filter_conditions.append(_odata_eq("serviceName", service_name))
         if service_family:
-            filter_conditions.append(f"serviceFamily eq '{service_family}'")
+            filter_conditions.append(_odata_eq("serviceFamily", service_family))
         if region:
-            filter_conditions.append(f"armRegionName eq '{region}'")
+            filter_conditions.append(_odata_eq("armRegionName", region))
         if sku_name:
-            filter_conditions.append(f"contains(skuName, '{sku_name}')")
+            if sku_exact:
+                filter_conditions.append(_odata_eq("skuName", sku_name))
+            else:
+                filter_conditions.append(f"contains(skuName, {_odata_literal(sku_name)})")
         if price_type:
-            filter_conditions.append(f"priceType eq '{price_type}'")
-        
-        # Construct query parameters
-        params = {
-            "api-version": DEFAULT_API_VERSION,
-            "currencyCode": currency_code
-        }
-        
-        if filter_conditions:
-            params["$filter"] = " and ".join(filter_conditions)
-        
-        # Limit results
-        if limit < MAX_RESULTS_PER_REQUEST:
-            params["$top"] = str(limit)
-        
-        # Make request
-        data = await self._make_request(AZURE_PRICING_BASE_URL, params)
+            filter_conditions.append(_odata_eq("priceType", price_type))
         
-        # Process results
-        items = data.get("Items", [])
+        params = _price_query_params(filter_conditions, limit)
         
-        # If we have more results than requested, truncate
-        if len(items) > limit:
-            items = items[:limit]
+        # Make request, following additional pages when limit exceeds one page
+        items, has_more = await self._fetch_items(_pricing_url(currency_code), params, limit)
         
         # SKU validation and clarification
         validation_info = {}
@@ -158,29 +837,45 @@ class AzurePricingServer:
             }
         
         # Apply discount if provided
-        if discount_percentage is not None and discount_percentage > 0 and isinstance(items, list):
+        has_discount = discount_percentage is not None and discount_percentage > 0
+        if has_discount and isinstance(items, list):
             items = self._apply_discount_to_items(items, discount_percentage)
         
-        result = {
+        # Build the result in one go, including discount and validation info when present
+        return {
             "items": items,
             "count": len(items) if isinstance(items, list) else 0,
-            "has_more": bool(data.get("NextPageLink")),
+            "has_more": has_more,
             "currency": currency_code,
-            "filters_applied": filter_conditions
+            "filters_applied": filter_conditions,
+            **({
+                "discount_applied": {
+                    "percentage": discount_percentage,
+                    "note": "Prices shown are after discount"
+                }
+            } if has_discount else {}),
+            **validation_info
         }
+    
+    async def _fetch_first_item(
+        self,
+        service_name: str,
+        sku_name: Optional[str],
+        region: str,
+        currency_code: str
+    ) -> Optional[PriceItem]:
+        """Fetch only the first price item matching a service, partial SKU name and region.
         
-        # Add discount info if applied
-        if discount_percentage is not None and discount_percentage > 0:
-            result["discount_applied"] = {
-                "percentage": discount_percentage,
-                "note": "Prices shown are after discount"
-            }
-        
-        # Add validation info if available
-        if validation_info:
-            result.update(validation_info)
+        A $top=1 query for callers that read a single row, skipping the validation,
+        discount and result building of search_azure_prices.
+        """
+        filter_conditions = [_odata_eq("serviceName", service_name), _odata_eq("armRegionName", region)]
+        if sku_name:
+            filter_conditions.append(f"contains(skuName, {_odata_literal(sku_name)})")
         
-        return result
+        data = await self._make_request(_pricing_url(currency_code), _price_query_params(filter_conditions, 1))
+        items = data.get("Items")
+        return items[0] if items else None
     
     async def _validate_and_suggest_skus(
         self,
@@ -190,8 +885,8 @@ class AzurePricingServer:
     ) -> Dict[str, Any]:
         """Validate SKU name and suggest alternatives if not found."""
         
-        # Try to find similar SKUs
-        suggestions = []
+        # Try to find similar SKUs, keeping the first 5 distinct matches
+        unique_suggestions = []
         
         if service_name:
             # Search for SKUs within the service
@@ -202,36 +897,28 @@ class AzurePricingServer:
                 validate_sku=False  # Avoid recursion
             )
             
-            # Find SKUs that partially match
+            # Find SKUs that partially match; the search words are split once up front
             sku_lower = sku_name.lower()
-            items = broad_search.get("items", [])
-            if items:  # Only process if items exist
-                for item in items:
-                    item_sku = item.get("skuName")
-                    if not item_sku:  # Skip items without SKU names
-                        continue
-                    item_sku_lower = item_sku.lower()
-                    if (sku_lower in item_sku_lower or 
-                        item_sku_lower in sku_lower or
-                        any(word in item_sku_lower for word in sku_lower.split() if word)):
-                        suggestions.append({
-                            "sku_name": item_sku,
-                            "product_name": item.get("productName", "Unknown"),
-                            "price": item.get("retailPrice", 0),
-                            "unit": item.get("unitOfMeasure", "Unknown"),
-                            "region": item.get("armRegionName", "Unknown")
-                        })
-        
-        # Remove duplicates and limit suggestions
-        seen_skus = set()
-        unique_suggestions = []
-        for suggestion in suggestions:
-            sku = suggestion["sku_name"]
-            if sku not in seen_skus:
-                seen_skus.add(sku)
-                unique_suggestions.append(suggestion)
-                if len(unique_suggestions) >= 5:
-                    break
+            sku_words = sku_lower.split()
+            seen_skus = set()
+            for item in broad_search.get("items", []):
+                item_sku = item.get("skuName")
+                if not item_sku or item_sku in seen_skus:  # Skip items without SKU names or already suggested
+                    continue
+                item_sku_lower = item_sku.lower()
+                if (sku_lower in item_sku_lower or 
+                    item_sku_lower in sku_lower or
+                    any(word in item_sku_lower for word in sku_words)):
+                    seen_skus.add(item_sku)
+                    unique_suggestions.append({
+                        "sku_name": item_sku,
+                        "product_name": item.get("productName", "Unknown"),
+                        "price": item.get("retailPrice", 0),
+                        "unit": item.get("unitOfMeasure", "Unknown"),
+                        "region": item.get("armRegionName", "Unknown")
+                    })
+                    if len(unique_suggestions) >= 5:
+                        break
         
         return {
             "sku_validation": {
@@ -242,32 +929,32 @@ class AzurePricingServer:
             }
         }
     
-    def _apply_discount_to_items(self, items: List[Dict], discount_percentage: float) -> List[Dict]:
+    def _apply_discount_to_items(self, items: List[PriceItem], discount_percentage: float) -> List[PriceItem]:
         """Apply discount percentage to pricing items."""
         if not items:
             return []
         
+        discount_factor = 1 - discount_percentage / 100
         discounted_items = []
         
         for item in items:
             discounted_item = item.copy()
             
             # Apply discount to retail price
-            if "retailPrice" in item and item["retailPrice"]:
-                original_price = item["retailPrice"]
-                discounted_price = original_price * (1 - discount_percentage / 100)
-                discounted_item["retailPrice"] = round(discounted_price, 6)
+            original_price = item.get("retailPrice")
+            if original_price:
+                discounted_item["retailPrice"] = round(original_price * discount_factor, 6)
                 discounted_item["originalPrice"] = original_price
             
             # Apply discount to savings plans if present
-            if "savingsPlan" in item and item["savingsPlan"] and isinstance(item["savingsPlan"], list):
+            savings_plans = item.get("savingsPlan")
+            if savings_plans and isinstance(savings_plans, list):
                 discounted_savings = []
-                for plan in item["savingsPlan"]:
+                for plan in savings_plans:
                     discounted_plan = plan.copy()
-                    if "retailPrice" in plan and plan["retailPrice"]:
-                        original_plan_price = plan["retailPrice"]
-                        discounted_plan_price = original_plan_price * (1 - discount_percentage / 100)
-                        discounted_plan["retailPrice"] = round(discounted_plan_price, 6)
+                    original_plan_price = plan.get("retailPrice")
+                    if original_plan_price:
+                        discounted_plan["retailPrice"] = round(original_plan_price * discount_factor, 6)
                         discounted_plan["originalPrice"] = original_plan_price
                     discounted_savings.append(discounted_plan)
                 discounted_item["savingsPlan"] = discounted_savings
@@ -277,13 +964,26 @@ class AzurePricingServer:
         return discounted_items
     
     async def get_customer_discount(self, customer_id: Optional[str] = None) -> Dict[str, Any]:
-        """Get customer discount information. Currently returns 10% default discount for all customers."""
+        """Get customer discount information. Currently returns 10% default discount for all customers.
+        
+        Memoized per customer via cached_call, so azure_price_search does not rebuild (or,
+        once backed by a customer database, re-query) the discount on every call.
+        The returned dict is shared and must be treated as read-only.
+        """
+        customer_id = customer_id or "default"
+        return await self.cached_call(
+            ("customer_discount", customer_id),
+            lambda: self._lookup_customer_discount(customer_id)
+        )
+    
+    async def _lookup_customer_discount(self, customer_id: str) -> Dict[str, Any]:
+        """Build the discount information behind get_customer_discount."""
         
         # For now, return a default 10% discount for all customers
         # In the future, this could be enhanced to query a customer database
         
         return {
-            "customer_id": customer_id or "default",
+            "customer_id": customer_id,
             "discount_percentage": 10.0,
             "discount_type": "standard",
             "description": "Standard customer discount",
@@ -305,30 +1005,50 @@ class AzurePricingServer:
         comparisons = []
         
         if regions and isinstance(regions, list):
-            # Compare across regions
+            # Compare across regions with a single OR-filtered query, taking the
+            # first item per region
+            first_items: Dict[str, Dict[str, Any]] = {}
+            try:
+                combined = await self.search_azure_prices(
+                    service_name=service_name,
+                    sku_name=sku_name,
+                    region=regions,
+                    currency_code=currency_code,
+                    limit=min(10 * len(regions), MAX_RESULTS_PER_REQUEST),
+                    validate_sku=False
+                )
+                for item in combined["items"]:
+                    first_items.setdefault((item.get("armRegionName") or "").lower(), item)
+            except Exception as e:
+                logger.warning("Combined region query failed, querying regions individually: %s", e)
+            
+            # Regions crowded out of the combined page are queried individually, concurrently
+            missing_regions = [region for region in regions if region.lower() not in first_items]
+            results = await asyncio.gather(
+                *(
+                    self._fetch_first_item(service_name, sku_name, region, currency_code)
+                    for region in missing_regions
+                ),
+                return_exceptions=True
+            )
+            
+            for region, result in zip(missing_regions, results):
+                if isinstance(result, Exception):
+                    logger.warning("Failed to get prices for region %s: %s", region, result)
+                elif result is not None:
+                    first_items[region.lower()] = result
+            
             for region in regions:
-                try:
-                    result = await self.search_azure_prices(
-                        service_name=service_name,
-                        sku_name=sku_name,
-                        region=region,
-                        currency_code=currency_code,
-                        limit=10
-                    )
-                    
-                    if result["items"]:
-                        # Get the first item for comparison
-                        item = result["items"][0]
-                        comparisons.append({
-                            "region": region,
-                            "sku_name": item.get("skuName"),
-                            "retail_price": item.get("retailPrice"),
-                            "unit_of_measure": item.get("unitOfMeasure"),
-                            "product_name": item.get("productName"),
-                            "meter_name": item.get("meterName")
-                        })
-                except Exception as e:
-                    logger.warning(f"Failed to get prices for region {region}: {e}")
+                item = first_items.get(region.lower())
+                if item:
+                    comparisons.append({
+                        "region": region,
+                        "sku_name": item.get("skuName"),
+                        "retail_price": item.get("retailPrice", 0),
+                        "unit_of_measure": item.get("unitOfMeasure"),
+                        "product_name": item.get("productName"),
+                        "meter_name": item.get("meterName")
+                    })
         else:
             # Compare different SKUs within the same service
             result = await self.search_azure_prices(
@@ -345,7 +1065,7 @@ class AzurePricingServer:
                 if sku and sku not in sku_prices:
                     sku_prices[sku] = {
                         "sku_name": sku,
-                        "retail_price": item.get("retailPrice"),
+                        "retail_price": item.get("retailPrice", 0),
                         "unit_of_measure": item.get("unitOfMeasure"),
                         "product_name": item.get("productName"),
                         "region": item.get("armRegionName"),
@@ -364,7 +1084,7 @@ class AzurePricingServer:
                     comparison["original_price"] = original_price
         
         # Sort by price
-        comparisons.sort(key=lambda x: x.get("retail_price", 0))
+        comparisons.sort(key=itemgetter("retail_price"))
         
         result = {
             "comparisons": comparisons,
@@ -393,16 +1113,10 @@ class AzurePricingServer:
     ) -> Dict[str, Any]:
         """Estimate monthly costs based on usage."""
         
-        # Get pricing information
-        result = await self.search_azure_prices(
-            service_name=service_name,
-            sku_name=sku_name,
-            region=region,
-            currency_code=currency_code,
-            limit=5
-        )
+        # Get pricing information; only the first matching row is used
+        item = await self._fetch_first_item(service_name, sku_name, region, currency_code)
         
-        if not result["items"]:
+        if item is None:
             return {
                 "error": f"No pricing found for {sku_name} in {region}",
                 "service_name": service_name,
@@ -410,13 +1124,14 @@ class AzurePricingServer:
                 "region": region
             }
         
-        item = result["items"][0]
         hourly_rate = item.get("retailPrice", 0)
         
         # Apply discount if provided
-        if discount_percentage is not None and discount_percentage > 0:
+        has_discount = discount_percentage is not None and discount_percentage > 0
+        if has_discount:
+            discount_factor = 1 - discount_percentage / 100
             original_hourly_rate = hourly_rate
-            hourly_rate = hourly_rate * (1 - discount_percentage / 100)
+            hourly_rate = hourly_rate * discount_factor
         
         # Calculate estimates
         monthly_cost = hourly_rate * hours_per_month
@@ -431,9 +1146,9 @@ class AzurePricingServer:
             plan_hourly = plan.get("retailPrice", 0)
             
             # Apply discount to savings plan prices too
-            if discount_percentage is not None and discount_percentage > 0:
+            if has_discount:
                 original_plan_hourly = plan_hourly
-                plan_hourly = plan_hourly * (1 - discount_percentage / 100)
+                plan_hourly = plan_hourly * discount_factor
             
             plan_monthly = plan_hourly * hours_per_month
             plan_yearly = plan_monthly * 12
@@ -449,10 +1164,11 @@ class AzurePricingServer:
             }
             
             # Add original prices if discount was applied
-            if discount_percentage is not None and discount_percentage > 0:
+            if has_discount:
+                original_plan_monthly = original_plan_hourly * hours_per_month
                 plan_data["original_hourly_rate"] = original_plan_hourly
-                plan_data["original_monthly_cost"] = round(original_plan_hourly * hours_per_month, 2)
-                plan_data["original_yearly_cost"] = round(original_plan_hourly * hours_per_month * 12, 2)
+                plan_data["original_monthly_cost"] = round(original_plan_monthly, 2)
+                plan_data["original_yearly_cost"] = round(original_plan_monthly * 12, 2)
             
             savings_estimates.append(plan_data)
         
@@ -477,15 +1193,17 @@ class AzurePricingServer:
         }
         
         # Add discount info and original prices if discount was applied
-        if discount_percentage is not None and discount_percentage > 0:
+        if has_discount:
+            original_monthly_cost = original_hourly_rate * hours_per_month
             result["discount_applied"] = {
                 "percentage": discount_percentage,
                 "note": "All prices shown are after discount"
             }
-            result["on_demand_pricing"]["original_hourly_rate"] = original_hourly_rate
-            result["on_demand_pricing"]["original_daily_cost"] = round(original_hourly_rate * 24, 2)
-            result["on_demand_pricing"]["original_monthly_cost"] = round(original_hourly_rate * hours_per_month, 2)
-            result["on_demand_pricing"]["original_yearly_cost"] = round(original_hourly_rate * hours_per_month * 12, 2)
+            on_demand_pricing = result["on_demand_pricing"]
+            on_demand_pricing["original_hourly_rate"] = original_hourly_rate
+            on_demand_pricing["original_daily_cost"] = round(original_hourly_rate * 24, 2)
+            on_demand_pricing["original_monthly_cost"] = round(original_monthly_cost, 2)
+            on_demand_pricing["original_yearly_cost"] = round(original_monthly_cost * 12, 2)
         
         return result
 
@@ -499,61 +1217,47 @@ class AzurePricingServer:
         """Discover available SKUs for a specific Azure service."""
         
         # Build filter conditions
-        filter_conditions = [f"serviceName eq '{service_name}'"]
+        filter_conditions = [_odata_eq("serviceName", service_name)]
         
         if region:
-            filter_conditions.append(f"armRegionName eq '{region}'")
-        
+            filter_conditions.append(_odata_eq("armRegionName", region))
         if price_type:
-            filter_conditions.append(f"priceType eq '{price_type}'")
+            filter_conditions.append(_odata_eq("priceType", price_type))
         
-        # Construct query parameters
-        params = {
-            "api-version": DEFAULT_API_VERSION,
-            "currencyCode": "USD"
-        }
+        params = _price_query_params(filter_conditions, limit)
         
-        if filter_conditions:
-            params["$filter"] = " and ".join(filter_conditions)
+        # Make request, following additional pages when limit exceeds one page
+        items, _ = await self._fetch_items(_pricing_url("USD"), params, limit)
         
-        # Limit results
-        if limit < MAX_RESULTS_PER_REQUEST:
-            params["$top"] = str(limit)
-        
-        # Make request
-        data = await self._make_request(AZURE_PRICING_BASE_URL, params)
-        
-        # Process and deduplicate SKUs
+        # Process and deduplicate SKUs, tracking seen regions per SKU in a set
         skus = {}
-        items = data.get("Items", [])
+        seen_regions: Dict[str, Set[str]] = {}
         
         for item in items:
             sku_name = item.get("skuName")
-            arm_sku_name = item.get("armSkuName")
-            product_name = item.get("productName")
-            region = item.get("armRegionName")
-            price = item.get("retailPrice", 0)
-            unit = item.get("unitOfMeasure")
-            meter_name = item.get("meterName")
+            if not sku_name:
+                continue
+            item_region = item.get("armRegionName")
             
-            if sku_name and sku_name not in skus:
+            if sku_name not in skus:
                 skus[sku_name] = {
                     "sku_name": sku_name,
-                    "arm_sku_name": arm_sku_name,
-                    "product_name": product_name,
-                    "sample_price": price,
-                    "unit_of_measure": unit,
-                    "meter_name": meter_name,
-                    "sample_region": region,
-                    "available_regions": [region] if region else []
+                    "arm_sku_name": item.get("armSkuName"),
+                    "product_name": item.get("productName"),
+                    "sample_price": item.get("retailPrice", 0),
+                    "unit_of_measure": item.get("unitOfMeasure"),
+                    "meter_name": item.get("meterName"),
+                    "sample_region": item_region,
+                    "available_regions": [item_region] if item_region else []
                 }
-            elif sku_name and region and region not in skus[sku_name]["available_regions"]:
+                seen_regions[sku_name] = {item_region}
+            elif item_region and item_region not in seen_regions[sku_name]:
                 # Add region to existing SKU
-                skus[sku_name]["available_regions"].append(region)
+                seen_regions[sku_name].add(item_region)
+                skus[sku_name]["available_regions"].append(item_region)
         
-        # Convert to list and sort by SKU name
-        sku_list = list(skus.values())
-        sku_list.sort(key=lambda x: x["sku_name"])
+        # Convert to a list ordered by SKU name, sorting the plain name keys
+        sku_list = [skus[sku_name] for sku_name in sorted(skus)]
         
         return {
             "service_name": service_name,
@@ -612,73 +1316,91 @@ class AzurePricingServer:
         currency_code: str = "USD",
         limit: int = 50
     ) -> Dict[str, Any]:
-        """Find services with similar names or suggest alternatives."""
-        
-        # Common service name mappings
-        service_mappings = {
-            # User input -> Correct Azure service name
-            "app service": "Azure App Service",
-            "web app": "Azure App Service",
-            "web apps": "Azure App Service",
-            "app services": "Azure App Service",
-            "websites": "Azure App Service",
-            "web service": "Azure App Service",
-            
-            "virtual machine": "Virtual Machines",
-            "vm": "Virtual Machines",
-            "vms": "Virtual Machines",
-            "compute": "Virtual Machines",
-            
-            "storage": "Storage",
-            "blob": "Storage",
-            "blob storage": "Storage",
-            "file storage": "Storage",
-            "disk": "Storage",
-            
-            "sql": "Azure SQL Database",
-            "sql database": "Azure SQL Database",
-            "database": "Azure SQL Database",
-            "sql server": "Azure SQL Database",
-            
-            "cosmos": "Azure Cosmos DB",
-            "cosmosdb": "Azure Cosmos DB",
-            "cosmos db": "Azure Cosmos DB",
-            "document db": "Azure Cosmos DB",
-            
-            "kubernetes": "Azure Kubernetes Service",
-            "aks": "Azure Kubernetes Service",
-            "k8s": "Azure Kubernetes Service",
-            "container service": "Azure Kubernetes Service",
-            
-            "functions": "Azure Functions",
-            "function app": "Azure Functions",
-            "serverless": "Azure Functions",
-            
-            "redis": "Azure Cache for Redis",
-            "cache": "Azure Cache for Redis",
-            
-            "ai": "Azure AI services",
-            "cognitive": "Azure AI services",
-            "cognitive services": "Azure AI services",
-            "openai": "Azure OpenAI",
-            
-            "networking": "Virtual Network",
-            "network": "Virtual Network",
-            "vnet": "Virtual Network",
-            
-            "load balancer": "Load Balancer",
-            "lb": "Load Balancer",
-            
-            "application gateway": "Application Gateway",
-            "app gateway": "Application Gateway",
-        }
+        """Find services with similar names or suggest alternatives.
+        
+        Results are memoized for the cache TTL, keyed on the normalized inputs.
+        """
+        key = (
+            "similar_services",
+            service_name.strip().lower() if service_name else None,
+            service_family.strip().lower() if service_family else None,
+            currency_code,
+            limit
+        )
+        result = await self.cached_call(
+            key,
+            lambda: self._search_similar_services(service_name, service_family, currency_code, limit)
+        )
+        
+        # Shallow copy so the caller's original spelling is reported without touching the cached entry
+        result = dict(result)
+        result["original_search"] = service_name or service_family
+        return result
+    
+    async def _sample_services(
+        self,
+        services: List[str],
+        currency_code: str,
+        per_service: int
+    ) -> Dict[str, List[PriceItem]]:
+        """Fetch up to `per_service` sample items for each service.
+        
+        All services share one OR-filtered query; services crowded out of that page
+        (or all of them, if it fails) are queried individually, concurrently.
+        """
+        samples: Dict[str, List[PriceItem]] = {}
+        if not services:
+            return samples
+        
+        try:
+            combined = await self.search_azure_prices(
+                service_name=services,
+                currency_code=currency_code,
+                limit=min(6 * len(services), MAX_RESULTS_PER_REQUEST),
+                validate_sku=False
+            )
+            for item in combined["items"]:
+                service_samples = samples.setdefault(item.get("serviceName", ""), [])
+                if len(service_samples) < per_service:
+                    service_samples.append(item)
+        except Exception as e:
+            logger.warning("Combined service query failed, querying services individually: %s", e)
+        
+        missing_services = [service for service in services if service not in samples]
+        results = await asyncio.gather(
+            *(
+                self.search_azure_prices(
+                    service_name=service,
+                    currency_code=currency_code,
+                    limit=per_service
+                )
+                for service in missing_services
+            ),
+            return_exceptions=True
+        )
+        for service, result in zip(missing_services, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to get prices for service %s: %s", service, result)
+            elif result["items"]:
+                samples[service] = result["items"][:per_service]
+        
+        return samples
+    
+    async def _search_similar_services(
+        self,
+        service_name: Optional[str],
+        service_family: Optional[str],
+        currency_code: str,
+        limit: int
+    ) -> Dict[str, Any]:
+        """Run the mapping, partial-match and broad-search flows behind _find_similar_services."""
         
         suggestions = []
-        search_term = service_name.lower() if service_name else ""
+        search_term = service_name.strip().lower() if service_name else ""
         
         # Try exact mapping first
-        if search_term in service_mappings:
-            correct_name = service_mappings[search_term]
+        if search_term in _SERVICE_MAPPINGS:
+            correct_name = _SERVICE_MAPPINGS[search_term]
             result = await self.search_azure_prices(
                 service_name=correct_name,
                 currency_code=currency_code,
@@ -691,26 +1413,29 @@ class AzurePricingServer:
                 result["match_type"] = "exact_mapping"
                 return result
         
-        # Try partial matching for common terms
-        partial_matches = []
-        for user_term, azure_service in service_mappings.items():
-            if search_term in user_term or user_term in search_term:
-                partial_matches.append(azure_service)
-        
-        # Remove duplicates and try each match
-        for azure_service in list(set(partial_matches)):
-            result = await self.search_azure_prices(
-                service_name=azure_service,
-                currency_code=currency_code,
-                limit=5
-            )
-            
-            if result["items"]:
+        # Try partial matching for common terms via the token index,
+        # falling back to a substring scan when no token matches
+        partial_matches: Set[str] = set()
+        for token in search_term.split():
+            partial_matches.update(_TOKEN_INDEX.get(token, ()))
+        if not partial_matches:
+            partial_matches = _substring_matches(search_term)
+        # Typos and abbreviations: only query the closest n-gram candidates
+        if not partial_matches and search_term:
+            partial_matches.update(service for service, _ in _SERVICE_NGRAM_INDEX.rank(search_term))
+        
+        # Sample all matches with one OR-filtered query
+        partial_services = sorted(partial_matches)
+        partial_samples = await self._sample_services(partial_services, currency_code, per_service=3)
+        for azure_service in partial_services:
+            if partial_samples.get(azure_service):
                 suggestions.append({
                     "service_name": azure_service,
                     "match_reason": f"Partial match for '{service_name}'",
-                    "sample_items": result["items"][:3]
+                    "sample_items": partial_samples[azure_service]
                 })
+                if len(suggestions) >= MAX_SERVICE_SUGGESTIONS:
+                    break
         
         # If still no matches, do a broad search and look for similar services
         if not suggestions:
@@ -720,30 +1445,35 @@ class AzurePricingServer:
                 limit=100
             )
             
-            # Find services that contain the search term
+            # Find services that contain the search term, normalizing each service once
             matching_services = set()
+            checked_services: Set[str] = set()
+            search_words = search_term.split()
             for item in broad_result.get("items", []):
                 service = item.get("serviceName", "")
-                product = item.get("productName", "")
+                if service in matching_services:
+                    continue
                 
-                if (search_term in service.lower() or 
-                    search_term in product.lower() or
-                    any(word in service.lower() for word in search_term.split())):
+                if service not in checked_services:
+                    checked_services.add(service)
+                    service_lower = service.lower()
+                    if search_term in service_lower or any(word in service_lower for word in search_words):
+                        matching_services.add(service)
+                        continue
+                
+                if search_term in item.get("productName", "").lower():
                     matching_services.add(service)
             
-            # Create suggestions from found services
-            for service in list(matching_services)[:5]:  # Limit to top 5
-                service_result = await self.search_azure_prices(
-                    service_name=service,
-                    currency_code=currency_code,
-                    limit=3
-                )
-                
-                if service_result["items"]:
+            # Fetch samples for the top services with a single OR-filtered query
+            top_services = list(islice(matching_services, MAX_SERVICE_SUGGESTIONS))
+            samples = await self._sample_services(top_services, currency_code, per_service=2)
+            
+            for service in top_services:
+                if samples.get(service):
                     suggestions.append({
                         "service_name": service,
                         "match_reason": f"Contains '{search_term}'",
-                        "sample_items": service_result["items"][:2]
+                        "sample_items": samples[service]
                     })
         
         return {
@@ -773,74 +1503,162 @@ class AzurePricingServer:
             limit: Maximum number of results
         """
         
-        # Use fuzzy matching to find the right service
-        result = await self.search_azure_prices_with_fuzzy_matching(
-            service_name=service_hint,
-            region=region,
-            currency_code=currency_code,
-            limit=limit
-        )
+        # Resolve known aliases and unambiguous prefixes via the trie first,
+        # avoiding a wasted query with the raw hint
+        result = None
+        resolved_service = _resolve_service_name(service_hint)
+        if resolved_service:
+            result = await self.search_azure_prices(
+                service_name=resolved_service,
+                region=region,
+                currency_code=currency_code,
+                limit=limit
+            )
+            if result["items"]:
+                result["suggestion_used"] = resolved_service
+                is_exact = resolved_service.lower() == " ".join(service_hint.lower().split())
+                result["match_type"] = "exact" if is_exact else "exact_mapping"
+        
+        if not result or not result["items"]:
+            # Use fuzzy matching to find the right service
+            result = await self.search_azure_prices_with_fuzzy_matching(
+                service_name=service_hint,
+                region=region,
+                currency_code=currency_code,
+                limit=limit
+            )
         
         # If we found exact matches, process SKUs
         if result["items"]:
-            skus = {}
-            service_used = result.get("suggestion_used", service_hint)
-            
-            for item in result["items"]:
-                sku_name = item.get("skuName", "Unknown")
-                arm_sku = item.get("armSkuName", "Unknown")
-                product = item.get("productName", "Unknown")
-                price = item.get("retailPrice", 0)
-                unit = item.get("unitOfMeasure", "Unknown")
-                item_region = item.get("armRegionName", "Unknown")
-                
-                if sku_name not in skus:
-                    skus[sku_name] = {
-                        "sku_name": sku_name,
-                        "arm_sku_name": arm_sku,
-                        "product_name": product,
-                        "prices": [],
-                        "regions": set()
-                    }
-                
-                skus[sku_name]["prices"].append({
-                    "price": price,
-                    "unit": unit,
-                    "region": item_region
-                })
-                skus[sku_name]["regions"].add(item_region)
-            
-            # Convert sets to lists for JSON serialization
-            for sku_data in skus.values():
-                sku_data["regions"] = list(sku_data["regions"])
-                # Keep only the cheapest price for summary - handle empty sequences
-                valid_prices = [p["price"] for p in sku_data["prices"] if p["price"] > 0]
-                if valid_prices:
-                    sku_data["min_price"] = min(valid_prices)
-                else:
-                    # If no valid prices > 0, use the first price (even if 0) or default to 0
-                    sku_data["min_price"] = sku_data["prices"][0]["price"] if sku_data["prices"] else 0
-                sku_data["sample_unit"] = sku_data["prices"][0]["unit"] if sku_data["prices"] else "Unknown"
-            
-            return {
-                "service_found": service_used,
-                "original_search": service_hint,
-                "skus": skus,
-                "total_skus": len(skus),
-                "currency": currency_code,
-                "match_type": result.get("match_type", "exact")
-            }
+            return self._sku_discovery_result(
+                service_hint,
+                result.get("suggestion_used", service_hint),
+                result["items"],
+                currency_code,
+                result.get("match_type", "exact")
+            )
         
         # If no exact matches, return suggestions
         return {
             "service_found": None,
             "original_search": service_hint,
             "skus": {},
+            "products": {},
             "total_skus": 0,
             "currency": currency_code,
             "suggestions": result.get("suggestions", []),
             "match_type": "no_match"
         }
+    
+    @staticmethod
+    def _sku_discovery_result(
+        service_hint: str,
+        service_used: str,
+        items: List[PriceItem],
+        currency_code: str,
+        match_type: str
+    ) -> Dict[str, Any]:
+        """Aggregate price items into the per-SKU discovery result for a resolved service."""
+        skus: Dict[str, SkuEntry] = {}
+        # SKUs grouped by product as they are first seen, so the formatter needs no regroup pass
+        products: Dict[str, List[Tuple[str, SkuEntry]]] = defaultdict(list)
+        
+        for item in items:
+            sku_name = item.get("skuName", "Unknown")
+            arm_sku = item.get("armSkuName", "Unknown")
+            product = item.get("productName", "Unknown")
+            price = item.get("retailPrice", 0)
+            unit = item.get("unitOfMeasure", "Unknown")
+            item_region = item.get("armRegionName", "Unknown")
+            
+            # Aggregate in a single pass, tracking the cheapest non-zero price as we go
+            sku_data = skus.get(sku_name)
+            if sku_data is None:
+                # min_price falls back to the first price (even if 0) when no price > 0 is seen
+                sku_data = skus[sku_name] = SkuEntry(sku_name, arm_sku, product, price, unit)
+                products[product].append((sku_name, sku_data))
+            elif price > 0 and (sku_data.min_price <= 0 or price < sku_data.min_price):
+                sku_data.min_price = price
+            
+            sku_data.regions.add(item_region)
+        
+        # Freeze the region sets once aggregation is done
+        for sku_data in skus.values():
+            sku_data.regions = tuple(sku_data.regions)
+        
+        return {
+            "service_found": service_used,
+            "original_search": service_hint,
+            "skus": skus,
+            "products": dict(products),
+            "total_skus": len(skus),
+            "currency": currency_code,
+            "match_type": match_type
+        }
+    
+    async def discover_many_service_skus(
+        self,
+        service_hints: List[str],
+        region: Optional[str] = None,
+        currency_code: str = "USD",
+        limit_per_service: int = 30
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Discover SKUs for several services at once, returning discover_service_skus results keyed by hint.
+        
+        Hints that resolve to a known service share one OR-filtered query. Unresolved hints,
+        and services the shared page may have truncated, go through discover_service_skus
+        concurrently.
+        
+        Args:
+            service_hints: User descriptions of the services (e.g., ["app service", "vm"])
+            region: Optional specific region to filter by
+            currency_code: Currency for pricing
+            limit_per_service: Maximum number of price items per service
+        """
+        resolved = {hint: _resolve_service_name(hint) for hint in service_hints}
+        services = sorted({service for service in resolved.values() if service})
+        
+        items_by_service: Dict[str, List[PriceItem]] = defaultdict(list)
+        complete = False
+        if services:
+            try:
+                combined = await self.search_azure_prices(
+                    service_name=services,
+                    region=region,
+                    currency_code=currency_code,
+                    limit=min(limit_per_service * len(services), MAX_RESULTS_PER_REQUEST),
+                    validate_sku=False
+                )
+                # Without more pages, every service's items are all in this result
+                complete = not combined["has_more"]
+                for item in combined["items"]:
+                    service_items = items_by_service[item.get("serviceName", "")]
+                    if len(service_items) < limit_per_service:
+                        service_items.append(item)
+            except Exception as e:
+                logger.warning("Combined SKU discovery query failed, discovering services individually: %s", e)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        fallback_hints = []
+        for hint, service in resolved.items():
+            service_items = items_by_service.get(service) if service else None
+            if service_items and (complete or len(service_items) >= limit_per_service):
+                is_exact = service.lower() == " ".join(hint.lower().split())
+                results[hint] = self._sku_discovery_result(
+                    hint, service, service_items, currency_code, "exact" if is_exact else "exact_mapping"
+                )
+            else:
+                fallback_hints.append(hint)
+        
+        discovered = await asyncio.gather(
+            *(
+                self.discover_service_skus(hint, region=region, currency_code=currency_code, limit=limit_per_service)
+                for hint in fallback_hints
+            )
+        )
+        results.update(zip(fallback_hints, discovered))
+        return {hint: results[hint] for hint in resolved}
 
 # Create the MCP server
 server = Server("azure-pricing")
@@ -848,529 +1666,578 @@ server = Server("azure-pricing")
 # Global server instance
 pricing_server = AzurePricingServer()
 
-@server.list_tools()
-async def handle_list_tools() -> List[Tool]:
-    """List available tools."""
-    return [
-        Tool(
-            name="azure_price_search",
-            description="Search Azure retail prices with various filters",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "service_name": {
-                        "type": "string",
-                        "description": "Azure service name (e.g., 'Virtual Machines', 'Storage')"
-                    },
-                    "service_family": {
-                        "type": "string",
-                        "description": "Service family (e.g., 'Compute', 'Storage', 'Networking')"
-                    },
-                    "region": {
-                        "type": "string",
-                        "description": "Azure region (e.g., 'eastus', 'westeurope')"
-                    },
-                    "sku_name": {
-                        "type": "string",
-                        "description": "SKU name to search for (partial matches supported)"
-                    },
-                    "price_type": {
-                        "type": "string",
-                        "description": "Price type: 'Consumption', 'Reservation', or 'DevTestConsumption'"
-                    },
-                    "currency_code": {
-                        "type": "string",
-                        "description": "Currency code (default: USD)",
-                        "default": "USD"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of results (default: 50)",
-                        "default": 50
-                    },
-                    "discount_percentage": {
-                        "type": "number",
-                        "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)"
-                    },
-                    "validate_sku": {
-                        "type": "boolean",
-                        "description": "Whether to validate SKU names and provide suggestions (default: true)",
-                        "default": true
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="azure_price_compare",
-            description="Compare Azure prices across regions or SKUs",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "service_name": {
-                        "type": "string",
-                        "description": "Azure service name to compare"
-                    },
-                    "sku_name": {
-                        "type": "string",
-                        "description": "Specific SKU to compare (optional)"
-                    },
-                    "regions": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of regions to compare (if not provided, compares SKUs)"
-                    },
-                    "currency_code": {
-                        "type": "string",
-                        "description": "Currency code (default: USD)",
-                        "default": "USD"
-                    },
-                    "discount_percentage": {
-                        "type": "number",
-                        "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)"
-                    }
+# Shared "pretty" argument for tools that return JSON
+_PRETTY_PROPERTY = {
+    "type": "boolean",
+    "description": "Indent the JSON output for human readers (default: false, compact)",
+    "default": False
+}
+
+# Tool definitions are static, so build them once at import time
+_TOOLS: Tuple[Tool, ...] = (
+    Tool(
+        name="azure_price_search",
+        description="Search Azure retail prices with various filters",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "service_name": {
+                    "type": "string",
+                    "description": "Azure service name (e.g., 'Virtual Machines', 'Storage')"
                 },
-                "required": ["service_name"]
-            }
-        ),
-        Tool(
-            name="azure_cost_estimate",
-            description="Estimate Azure costs based on usage patterns",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "service_name": {
-                        "type": "string",
-                        "description": "Azure service name"
-                    },
-                    "sku_name": {
-                        "type": "string",
-                        "description": "SKU name"
-                    },
-                    "region": {
-                        "type": "string",
-                        "description": "Azure region"
-                    },
-                    "hours_per_month": {
-                        "type": "number",
-                        "description": "Expected hours of usage per month (default: 730 for full month)",
-                        "default": 730
-                    },
-                    "currency_code": {
-                        "type": "string",
-                        "description": "Currency code (default: USD)",
-                        "default": "USD"
-                    },
-                    "discount_percentage": {
-                        "type": "number",
-                        "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)"
-                    }
+                "service_family": {
+                    "type": "string",
+                    "description": "Service family (e.g., 'Compute', 'Storage', 'Networking')"
                 },
-                "required": ["service_name", "sku_name", "region"]
-            }
-        ),
-        Tool(
-            name="azure_discover_skus",
-            description="Discover available SKUs for a specific Azure service",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "service_name": {
-                        "type": "string",
-                        "description": "Azure service name"
-                    },
-                    "region": {
-                        "type": "string",
-                        "description": "Azure region (optional)"
-                    },
-                    "price_type": {
-                        "type": "string",
-                        "description": "Price type (default: 'Consumption')",
-                        "default": "Consumption"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of SKUs to return (default: 100)",
-                        "default": 100
-                    }
+                "region": {
+                    "type": "string",
+                    "description": "Azure region (e.g., 'eastus', 'westeurope')"
                 },
-                "required": ["service_name"]
-            }
-        ),
-        Tool(
-            name="azure_sku_discovery",
-            description="Discover available SKUs for Azure services with intelligent name matching",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "service_hint": {
-                        "type": "string",
-                        "description": "Service name or description (e.g., 'app service', 'web app', 'vm', 'storage'). Supports fuzzy matching."
-                    },
-                    "region": {
-                        "type": "string",
-                        "description": "Optional Azure region to filter results"
-                    },
-                    "currency_code": {
-                        "type": "string",
-                        "description": "Currency code (default: USD)",
-                        "default": "USD"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of results (default: 30)",
-                        "default": 30
-                    }
+                "sku_name": {
+                    "type": "string",
+                    "description": "SKU name to search for (partial matches supported)"
+                },
+                "price_type": {
+                    "type": "string",
+                    "description": "Price type: 'Consumption', 'Reservation', or 'DevTestConsumption'"
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 50)",
+                    "default": 50
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)"
                 },
-                "required": ["service_hint"]
+                "validate_sku": {
+                    "type": "boolean",
+                    "description": "Whether to validate SKU names and provide suggestions (default: true)",
+                    "default": True
+                },
+                "sku_exact": {
+                    "type": "boolean",
+                    "description": "Match sku_name exactly instead of as a partial match (default: false)",
+                    "default": False
+                },
+                "pretty": _PRETTY_PROPERTY
             }
-        ),
-        Tool(
-            name="get_customer_discount",
-            description="Get customer discount information. Returns default 10% discount for all customers.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "customer_id": {
-                        "type": "string",
-                        "description": "Customer ID (optional, defaults to 'default' customer)"
-                    }
+        }
+    ),
+    Tool(
+        name="azure_price_compare",
+        description="Compare Azure prices across regions or SKUs",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "service_name": {
+                    "type": "string",
+                    "description": "Azure service name to compare"
+                },
+                "sku_name": {
+                    "type": "string",
+                    "description": "Specific SKU to compare (optional)"
+                },
+                "regions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of regions to compare (if not provided, compares SKUs)"
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD"
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)"
+                },
+                "pretty": _PRETTY_PROPERTY
+            },
+            "required": ["service_name"]
+        }
+    ),
+    Tool(
+        name="azure_cost_estimate",
+        description="Estimate Azure costs based on usage patterns",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "service_name": {
+                    "type": "string",
+                    "description": "Azure service name"
+                },
+                "sku_name": {
+                    "type": "string",
+                    "description": "SKU name"
+                },
+                "region": {
+                    "type": "string",
+                    "description": "Azure region"
+                },
+                "hours_per_month": {
+                    "type": "number",
+                    "description": "Expected hours of usage per month (default: 730 for full month)",
+                    "default": 730
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD"
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)"
+                }
+            },
+            "required": ["service_name", "sku_name", "region"]
+        }
+    ),
+    Tool(
+        name="azure_discover_skus",
+        description="Discover available SKUs for a specific Azure service",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "service_name": {
+                    "type": "string",
+                    "description": "Azure service name"
+                },
+                "region": {
+                    "type": "string",
+                    "description": "Azure region (optional)"
+                },
+                "price_type": {
+                    "type": "string",
+                    "description": "Price type (default: 'Consumption')",
+                    "default": "Consumption"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of SKUs to return (default: 100)",
+                    "default": 100
+                },
+                "pretty": _PRETTY_PROPERTY
+            },
+            "required": ["service_name"]
+        }
+    ),
+    Tool(
+        name="azure_sku_discovery",
+        description="Discover available SKUs for Azure services with intelligent name matching",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "service_hint": {
+                    "type": ["string", "array"],
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "description": "Service name or description (e.g., 'app service', 'web app', 'vm', 'storage'), or a list of them to discover several services with one batched query. Supports fuzzy matching."
+                },
+                "region": {
+                    "type": "string",
+                    "description": "Optional Azure region to filter results"
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results, per service when several are given (default: 30)",
+                    "default": 30
+                }
+            },
+            "required": ["service_hint"]
+        }
+    ),
+    Tool(
+        name="get_customer_discount",
+        description="Get customer discount information. Returns default 10% discount for all customers.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "customer_id": {
+                    "type": "string",
+                    "description": "Customer ID (optional, defaults to 'default' customer)"
                 }
             }
-        )
-    ]
+        }
+    )
+)
 
-@server.call_tool()
-async def handle_call_tool(name: str, arguments: dict) -> list:
-    """Handle tool calls."""
-    
-    try:
-        async with pricing_server:
-            if name == "azure_price_search":
-                # Always get customer discount and apply it
-                customer_discount = await pricing_server.get_customer_discount()
-                discount_percentage = customer_discount["discount_percentage"]
-                
-                # Add discount to arguments if not already specified
-                if "discount_percentage" not in arguments:
-                    arguments["discount_percentage"] = discount_percentage
-                
-                result = await pricing_server.search_azure_prices(**arguments)
-                
-                # Format the response
-                if result["items"]:
-                    formatted_items = []
-                    for item in result["items"]:
-                        formatted_item = {
-                            "service": item.get("serviceName"),
-                            "product": item.get("productName"),
-                            "sku": item.get("skuName"),
-                            "region": item.get("armRegionName"),
-                            "location": item.get("location"),
-                            "discounted_price": item.get("retailPrice"),
-                            "unit": item.get("unitOfMeasure"),
-                            "type": item.get("type"),
-                            "savings_plans": item.get("savingsPlan", [])
-                        }
-                        
-                        # Add original price and savings if discount was applied
-                        if "originalPrice" in item:
-                            original_price = item["originalPrice"]
-                            discounted_price = item["retailPrice"]
-                            savings_amount = original_price - discounted_price
-                            
-                            formatted_item["original_price"] = original_price
-                            formatted_item["savings_amount"] = round(savings_amount, 6)
-                            formatted_item["savings_percentage"] = round((savings_amount / original_price * 100), 2) if original_price > 0 else 0
-                        
-                        formatted_items.append(formatted_item)
-                    
-                    if result["count"] > 0:
-                        response_text = f"Found {result['count']} Azure pricing results:\n\n"
-                        
-                        # Add discount information if applied
-                        if "discount_applied" in result:
-                            response_text += f"💰 **Customer Discount Applied: {result['discount_applied']['percentage']}%**\n"
-                            response_text += f"   {result['discount_applied']['note']}\n\n"
-                        
-                        # Add SKU validation info if present
-                        if "sku_validation" in result:
-                            validation = result["sku_validation"]
-                            response_text += f"⚠️ SKU Validation: {validation['message']}\n"
-                            if validation["suggestions"]:
-                                response_text += "🔍 Suggested SKUs:\n"
-                                for suggestion in validation["suggestions"][:3]:
-                                    response_text += f"   • {suggestion['sku_name']}: ${suggestion['price']} per {suggestion['unit']}\n"
-                                response_text += "\n"
-                        
-                        # Add clarification info if present
-                        if "clarification" in result:
-                            clarification = result["clarification"]
-                            response_text += f"ℹ️ {clarification['message']}\n"
-                            if clarification["suggestions"]:
-                                response_text += "Top matches:\n"
-                                for suggestion in clarification["suggestions"]:
-                                    response_text += f"   • {suggestion}\n"
-                                response_text += "\n"
-                        
-                        # Add summary of savings if discount was applied
-                        if "discount_applied" in result:
-                            total_original_cost = sum(item.get("original_price", 0) for item in formatted_items)
-                            total_discounted_cost = sum(item.get("discounted_price", 0) for item in formatted_items)
-                            total_savings = total_original_cost - total_discounted_cost
-                            
-                            if total_savings > 0:
-                                response_text += f"💰 **Total Savings Summary:**\n"
-                                response_text += f"   Original Total: ${total_original_cost:.6f}\n"
-                                response_text += f"   Discounted Total: ${total_discounted_cost:.6f}\n"
-                                response_text += f"   **You Save: ${total_savings:.6f}**\n\n"
-                        
-                        response_text += "**Detailed Pricing:**\n"
-                        response_text += json.dumps(formatted_items, indent=2)
-                        
-                        return [
-                            TextContent(
-                                type="text",
-                                text=response_text
-                            )
-                        ]
-                    else:
-                        # Handle case where items exist but count is 0 (shouldn't happen, but safety)
-                        response_text = "No valid pricing results found."
-                        return [
-                            TextContent(
-                                type="text",
-                                text=response_text
-                            )
-                        ]
-                else:
-                    response_text = "No pricing results found for the specified criteria."
-                    
-                    # Show discount info even when no results
-                    if "discount_applied" in result:
-                        response_text += f"\n\n💰 Note: Your {result['discount_applied']['percentage']}% customer discount would have been applied to any results."
-                    
-                    # Add SKU validation info if present
-                    if "sku_validation" in result:
-                        validation = result["sku_validation"]
-                        response_text += f"\n\n⚠️ {validation['message']}\n"
-                        if validation["suggestions"]:
-                            response_text += "\n🔍 Did you mean one of these SKUs?\n"
-                            for suggestion in validation["suggestions"][:5]:
-                                response_text += f"   • {suggestion['sku_name']}: ${suggestion['price']} per {suggestion['unit']}"
-                                if suggestion['region']:
-                                    response_text += f" (in {suggestion['region']})"
-                                response_text += "\n"
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=response_text
-                        )
-                    ]
-            
-            elif name == "azure_price_compare":
-                result = await pricing_server.compare_prices(**arguments)
-                
-                response_text = f"Price comparison for {result['service_name']}:\n\n"
-                
-                # Add discount information if applied
-                if "discount_applied" in result:
-                    response_text += f"💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n\n"
-                
-                response_text += json.dumps(result["comparisons"], indent=2)
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=response_text
-                    )
-                ]
-            
-            elif name == "azure_cost_estimate":
-                result = await pricing_server.estimate_costs(**arguments)
-                
-                if "error" in result:
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"Error: {result['error']}"
-                        )
-                    ]
-                
-                # Format cost estimate
-                estimate_text = f"""
-Cost Estimate for {result['service_name']} - {result['sku_name']}
-Region: {result['region']}
-Product: {result['product_name']}
-Unit: {result['unit_of_measure']}
-Currency: {result['currency']}
-"""
+# Schema defaults per tool, left out of tool-cache keys so that omitting an
+# argument and passing its default value share one cache entry
+_TOOL_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    tool.name: {
+        prop: schema["default"]
+        for prop, schema in tool.inputSchema.get("properties", {}).items()
+        if "default" in schema
+    }
+    for tool in _TOOLS
+}
+
+def _tool_cache_key(name: str, arguments: Dict[str, Any]) -> Tuple[str, str, bytes]:
+    """Build the tool-result cache key from the tool name and its non-default arguments."""
+    defaults = _TOOL_DEFAULTS.get(name, {})
+    normalized = {
+        arg: value for arg, value in arguments.items()
+        if arg not in defaults or defaults[arg] != value
+    }
+    return ("tool", name, orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS))
 
-                # Add discount information if applied
-                if "discount_applied" in result:
-                    estimate_text += f"\n💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
+@server.list_tools()
+async def handle_list_tools() -> List[Tool]:
+    """List available tools."""
+    return list(_TOOLS)
+
+# azure_sku_discovery hint when no known service resembles the search
+_NO_MATCH_HINT = (
+    "💡 Try using terms like:\n"
+    "• 'app service' or 'web app' for Azure App Service\n"
+    "• 'vm' or 'virtual machine' for Virtual Machines\n"
+    "• 'storage' or 'blob' for Storage services\n"
+    "• 'sql' or 'database' for SQL Database\n"
+    "• 'kubernetes' or 'aks' for Azure Kubernetes Service"
+)
 
-                estimate_text += f"""
+# azure_cost_estimate output templates, filled with str.format_map
+_ESTIMATE_HEADER_TEMPLATE = """
+Cost Estimate for {service_name} - {sku_name}
+Region: {region}
+Product: {product_name}
+Unit: {unit_of_measure}
+Currency: {currency}
+"""
+_ESTIMATE_DISCOUNT_TEMPLATE = "\n💰 {percentage}% discount applied - {note}\n"
+_ESTIMATE_USAGE_TEMPLATE = """
 Usage Assumptions:
-- Hours per month: {result['usage_assumptions']['hours_per_month']}
-- Hours per day: {result['usage_assumptions']['hours_per_day']}
+- Hours per month: {usage_assumptions[hours_per_month]}
+- Hours per day: {usage_assumptions[hours_per_day]}
 
 On-Demand Pricing:
-- Hourly Rate: ${result['on_demand_pricing']['hourly_rate']}
-- Daily Cost: ${result['on_demand_pricing']['daily_cost']}
-- Monthly Cost: ${result['on_demand_pricing']['monthly_cost']}
-- Yearly Cost: ${result['on_demand_pricing']['yearly_cost']}
+- Hourly Rate: ${on_demand_pricing[hourly_rate]}
+- Daily Cost: ${on_demand_pricing[daily_cost]}
+- Monthly Cost: ${on_demand_pricing[monthly_cost]}
+- Yearly Cost: ${on_demand_pricing[yearly_cost]}
 """
-
-                # Add original pricing if discount was applied
-                if "discount_applied" in result and "original_hourly_rate" in result['on_demand_pricing']:
-                    estimate_text += f"""
+_ESTIMATE_ORIGINAL_TEMPLATE = """
 Original Pricing (before discount):
-- Hourly Rate: ${result['on_demand_pricing']['original_hourly_rate']}
-- Daily Cost: ${result['on_demand_pricing']['original_daily_cost']}
-- Monthly Cost: ${result['on_demand_pricing']['original_monthly_cost']}
-- Yearly Cost: ${result['on_demand_pricing']['original_yearly_cost']}
+- Hourly Rate: ${original_hourly_rate}
+- Daily Cost: ${original_daily_cost}
+- Monthly Cost: ${original_monthly_cost}
+- Yearly Cost: ${original_yearly_cost}
 """
-                
-                if result['savings_plans']:
-                    estimate_text += "\nSavings Plans Available:\n"
-                    for plan in result['savings_plans']:
-                        estimate_text += f"""
-{plan['term']} Term:
-- Hourly Rate: ${plan['hourly_rate']}
-- Monthly Cost: ${plan['monthly_cost']}
-- Yearly Cost: ${plan['yearly_cost']}
-- Savings: {plan['savings_percent']}% (${plan['annual_savings']} annually)
+_ESTIMATE_PLAN_TEMPLATE = """
+{term} Term:
+- Hourly Rate: ${hourly_rate}
+- Monthly Cost: ${monthly_cost}
+- Yearly Cost: ${yearly_cost}
+- Savings: {savings_percent}% (${annual_savings} annually)
 """
-                        # Add original pricing for savings plans if discount was applied
-                        if "original_hourly_rate" in plan:
-                            estimate_text += f"""- Original Hourly Rate: ${plan['original_hourly_rate']}
-- Original Monthly Cost: ${plan['original_monthly_cost']}
-- Original Yearly Cost: ${plan['original_yearly_cost']}
+_ESTIMATE_PLAN_ORIGINAL_TEMPLATE = """- Original Hourly Rate: ${original_hourly_rate}
+- Original Monthly Cost: ${original_monthly_cost}
+- Original Yearly Cost: ${original_yearly_cost}
 """
+
+def _format_estimate(result: Dict[str, Any]) -> str:
+    """Render an estimate_costs result using the precompiled templates."""
+    on_demand = result["on_demand_pricing"]
+    parts = [_ESTIMATE_HEADER_TEMPLATE.format_map(result)]
+    
+    # Add discount information if applied
+    if "discount_applied" in result:
+        parts.append(_ESTIMATE_DISCOUNT_TEMPLATE.format_map(result["discount_applied"]))
+    
+    parts.append(_ESTIMATE_USAGE_TEMPLATE.format_map(result))
+    
+    # Add original pricing if discount was applied
+    if "discount_applied" in result and "original_hourly_rate" in on_demand:
+        parts.append(_ESTIMATE_ORIGINAL_TEMPLATE.format_map(on_demand))
+    
+    if result["savings_plans"]:
+        parts.append("\nSavings Plans Available:\n")
+        for plan in result["savings_plans"]:
+            parts.append(_ESTIMATE_PLAN_TEMPLATE.format_map(plan))
+            # Add original pricing for savings plans if discount was applied
+            if "original_hourly_rate" in plan:
+                parts.append(_ESTIMATE_PLAN_ORIGINAL_TEMPLATE.format_map(plan))
+    
+    return "".join(parts)
+
+def _text_response(text: str) -> List[TextContent]:
+    """Wrap tool output text in the single-item content list returned by every tool."""
+    return [TextContent(type="text", text=text)]
+
+def _error_response(result: Mapping[str, Any]) -> Optional[List[TextContent]]:
+    """Return the error response for a pricing result that reports an error, else None."""
+    if "error" not in result:
+        return None
+    return _text_response(f"Error: {result['error']}")
+
+def _dump_json(value: Any, pretty: bool = False) -> str:
+    """Serialize tool output as JSON using orjson, compact unless pretty is set."""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+
+async def _handle_price_search(arguments: dict, pretty: bool) -> List[TextContent]:
+    """Format azure_price_search results with discount and validation details."""
+    # Always get customer discount and apply it
+    customer_discount = await pricing_server.get_customer_discount()
+    discount_percentage = customer_discount["discount_percentage"]
+    
+    # Add discount to arguments if not already specified
+    if "discount_percentage" not in arguments:
+        arguments["discount_percentage"] = discount_percentage
+    
+    result = await pricing_server.search_azure_prices(**arguments)
+    error = _error_response(result)
+    if error:
+        return error
+    
+    # Format the response
+    if result["items"]:
+        formatted_items: List[FormattedPriceItem] = []
+        total_original_cost = 0.0
+        total_discounted_cost = 0.0
+        for item in result["items"]:
+            discounted_price = item.get("retailPrice")
+            formatted_item: FormattedPriceItem = {
+                "service": item.get("serviceName"),
+                "product": item.get("productName"),
+                "sku": item.get("skuName"),
+                "region": item.get("armRegionName"),
+                "location": item.get("location"),
+                "discounted_price": discounted_price,
+                "unit": item.get("unitOfMeasure"),
+                "type": item.get("type"),
+                "savings_plans": item.get("savingsPlan", [])
+            }
+            
+            # Add original price and savings if discount was applied
+            original_price = item.get("originalPrice")
+            if original_price is not None:
+                savings_amount = original_price - discounted_price
                 
-                return [
-                    TextContent(
-                        type="text",
-                        text=estimate_text
-                    )
-                ]
+                formatted_item["original_price"] = original_price
+                formatted_item["savings_amount"] = round(savings_amount, 6)
+                formatted_item["savings_percentage"] = round((savings_amount / original_price * 100), 2) if original_price > 0 else 0
+                total_original_cost += original_price
+            
+            # Totals are accumulated here instead of re-scanning formatted_items
+            total_discounted_cost += discounted_price or 0
+            formatted_items.append(formatted_item)
+        
+        if result["count"] > 0:
+            parts = [f"Found {result['count']} Azure pricing results:\n\n"]
+            
+            # Add discount information if applied
+            if "discount_applied" in result:
+                parts.append(f"💰 **Customer Discount Applied: {result['discount_applied']['percentage']}%**\n")
+                parts.append(f"   {result['discount_applied']['note']}\n\n")
+            
+            # Add SKU validation info if present
+            if "sku_validation" in result:
+                validation = result["sku_validation"]
+                parts.append(f"⚠️ SKU Validation: {validation['message']}\n")
+                if validation["suggestions"]:
+                    parts.append("🔍 Suggested SKUs:\n")
+                    for suggestion in validation["suggestions"][:3]:
+                        parts.append(f"   • {suggestion['sku_name']}: ${suggestion['price']} per {suggestion['unit']}\n")
+                    parts.append("\n")
+            
+            # Add clarification info if present
+            if "clarification" in result:
+                clarification = result["clarification"]
+                parts.append(f"ℹ️ {clarification['message']}\n")
+                if clarification["suggestions"]:
+                    parts.append("Top matches:\n")
+                    for suggestion in clarification["suggestions"]:
+                        parts.append(f"   • {suggestion}\n")
+                    parts.append("\n")
             
-            elif name == "azure_discover_skus":
-                result = await pricing_server.discover_skus(**arguments)
+            # Add summary of savings if discount was applied
+            if "discount_applied" in result:
+                total_savings = total_original_cost - total_discounted_cost
                 
-                # Format the response
-                skus = result.get("skus", [])
-                if skus:
-                    return [
-                        TextContent(
-                            type="text",
-                            text=f"Found {result['total_skus']} SKUs for {result['service_name']}:\n\n" +
-                                 json.dumps(skus, indent=2)
-                        )
-                    ]
-                else:
-                    return [
-                        TextContent(
-                            type="text",
-                            text="No SKUs found for the specified service."
-                        )
-                    ]
+                if total_savings > 0:
+                    parts.append(f"💰 **Total Savings Summary:**\n")
+                    parts.append(f"   Original Total: ${total_original_cost:.6f}\n")
+                    parts.append(f"   Discounted Total: ${total_discounted_cost:.6f}\n")
+                    parts.append(f"   **You Save: ${total_savings:.6f}**\n\n")
+            
+            parts.append("**Detailed Pricing:**\n")
+            # Serialized once and joined without another copy of the payload
+            parts.append(_dump_json(formatted_items, pretty))
             
-            elif name == "azure_sku_discovery":
-                result = await pricing_server.discover_service_skus(**arguments)
+            return _text_response("".join(parts))
+        else:
+            # Handle case where items exist but count is 0 (shouldn't happen, but safety)
+            return _text_response("No valid pricing results found.")
+    else:
+        parts = ["No pricing results found for the specified criteria."]
+        
+        # Show discount info even when no results
+        if "discount_applied" in result:
+            parts.append(f"\n\n💰 Note: Your {result['discount_applied']['percentage']}% customer discount would have been applied to any results.")
+        
+        # Add SKU validation info if present
+        if "sku_validation" in result:
+            validation = result["sku_validation"]
+            parts.append(f"\n\n⚠️ {validation['message']}\n")
+            if validation["suggestions"]:
+                parts.append("\n🔍 Did you mean one of these SKUs?\n")
+                for suggestion in validation["suggestions"][:5]:
+                    parts.append(f"   • {suggestion['sku_name']}: ${suggestion['price']} per {suggestion['unit']}")
+                    if suggestion['region']:
+                        parts.append(f" (in {suggestion['region']})")
+                    parts.append("\n")
+        
+        return _text_response("".join(parts))
+
+async def _handle_price_compare(arguments: dict, pretty: bool) -> List[TextContent]:
+    """Format an azure_price_compare comparison."""
+    result = await pricing_server.compare_prices(**arguments)
+    error = _error_response(result)
+    if error:
+        return error
+    
+    parts = [f"Price comparison for {result['service_name']}:\n\n"]
+    
+    # Add discount information if applied
+    if "discount_applied" in result:
+        parts.append(f"💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n\n")
+    
+    parts.append(_dump_json(result["comparisons"], pretty))
+    
+    return _text_response("".join(parts))
+
+async def _handle_cost_estimate(arguments: dict, pretty: bool) -> List[TextContent]:
+    """Format an azure_cost_estimate result."""
+    result = await pricing_server.estimate_costs(**arguments)
+    
+    error = _error_response(result)
+    if error:
+        return error
+    
+    return _text_response(_format_estimate(result))
+
+async def _handle_discover_skus(arguments: dict, pretty: bool) -> List[TextContent]:
+    """Format the azure_discover_skus SKU listing."""
+    result = await pricing_server.discover_skus(**arguments)
+    error = _error_response(result)
+    if error:
+        return error
+    
+    # Format the response
+    skus = result.get("skus", [])
+    if skus:
+        return _text_response(f"Found {result['total_skus']} SKUs for {result['service_name']}:\n\n" + _dump_json(skus, pretty))
+    else:
+        return _text_response("No SKUs found for the specified service.")
+
+async def _handle_sku_discovery(arguments: dict, pretty: bool) -> List[TextContent]:
+    """Format azure_sku_discovery results or service suggestions."""
+    if isinstance(arguments.get("service_hint"), list):
+        # Several hints: discover resolvable services with one batched query
+        service_hints = arguments.pop("service_hint")
+        if not service_hints or not all(isinstance(hint, str) for hint in service_hints):
+            return _text_response("Error: service_hint must be a service name or a non-empty list of service names")
+        limit = arguments.pop("limit", 30)
+        results = await pricing_server.discover_many_service_skus(service_hints, limit_per_service=limit, **arguments)
+        return _text_response("\n".join(
+            f"Error: {result['error']}" if "error" in result else _format_sku_discovery(result)
+            for result in results.values()
+        ))
+    
+    result = await pricing_server.discover_service_skus(**arguments)
+    error = _error_response(result)
+    if error:
+        return error
+    return _text_response(_format_sku_discovery(result))
+
+def _format_sku_discovery(result: Mapping[str, Any]) -> str:
+    """Render a discover_service_skus result as azure_sku_discovery text."""
+    if result["service_found"]:
+        # Format successful SKU discovery
+        service_name = result["service_found"]
+        original_search = result["original_search"]
+        total_skus = result["total_skus"]
+        match_type = result.get("match_type", "exact")
+        
+        parts = [f"SKU Discovery for '{original_search}'"]
+        
+        if match_type == "exact_mapping":
+            parts.append(f" (mapped to: {service_name})")
+        
+        parts.append(f"\n\nFound {total_skus} SKUs for {service_name}:\n\n")
+        
+        for product, product_skus in result["products"].items():
+            parts.append(f"📦 {product}:\n")
+            # First 10 SKUs by name per product, without sorting the whole list;
+            # keyed on the name so SkuEntry objects are never compared
+            for sku_name, sku_data in heapq.nsmallest(10, product_skus, key=itemgetter(0)):
+                region_count = len(sku_data.regions)
                 
-                if result["service_found"]:
-                    # Format successful SKU discovery
-                    service_name = result["service_found"]
-                    original_search = result["original_search"]
-                    skus = result["skus"]
-                    total_skus = result["total_skus"]
-                    match_type = result.get("match_type", "exact")
-                    
-                    response_text = f"SKU Discovery for '{original_search}'"
-                    
-                    if match_type == "exact_mapping":
-                        response_text += f" (mapped to: {service_name})"
-                    
-                    response_text += f"\n\nFound {total_skus} SKUs for {service_name}:\n\n"
-                    
-                    # Group SKUs by product
-                    products = {}
-                    for sku_name, sku_data in skus.items():
-                        product = sku_data["product_name"]
-                        if product not in products:
-                            products[product] = []
-                        products[product].append((sku_name, sku_data))
-                    
-                    for product, product_skus in products.items():
-                        response_text += f"📦 {product}:\n"
-                        for sku_name, sku_data in sorted(product_skus)[:10]:  # Limit to 10 per product
-                            min_price = sku_data.get("min_price", 0)
-                            unit = sku_data.get("sample_unit", "Unknown")
-                            region_count = len(sku_data.get("regions", []))
-                            
-                            response_text += f"   • {sku_name}\n"
-                            response_text += f"     Price: ${min_price} per {unit}"
-                            if region_count > 1:
-                                response_text += f" (available in {region_count} regions)"
-                            response_text += "\n"
-                        response_text += "\n"
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=response_text
-                        )
-                    ]
-                else:
-                    # Format suggestions when no exact match
-                    suggestions = result.get("suggestions", [])
-                    original_search = result["original_search"]
-                    
-                    if suggestions:
-                        response_text = f"No exact match found for '{original_search}'\n\n"
-                        response_text += "🔍 Did you mean one of these services?\n\n"
-                        
-                        for i, suggestion in enumerate(suggestions[:5], 1):
-                            service_name = suggestion["service_name"]
-                            match_reason = suggestion["match_reason"]
-                            sample_items = suggestion["sample_items"]
-                            
-                            response_text += f"{i}. {service_name}\n"
-                            response_text += f"   Reason: {match_reason}\n"
-                            
-                            if sample_items:
-                                response_text += "   Sample SKUs:\n"
-                                for item in sample_items[:3]:
-                                    sku = item.get("skuName", "Unknown")
-                                    price = item.get("retailPrice", 0)
-                                    unit = item.get("unitOfMeasure", "Unknown")
-                                    response_text += f"     • {sku}: ${price} per {unit}\n"
-                            response_text += "\n"
-                        
-                        response_text += "💡 Try using one of the exact service names above."
-                    else:
-                        response_text = f"No matches found for '{original_search}'\n\n"
-                        response_text += "💡 Try using terms like:\n"
-                        response_text += "• 'app service' or 'web app' for Azure App Service\n"
-                        response_text += "• 'vm' or 'virtual machine' for Virtual Machines\n"
-                        response_text += "• 'storage' or 'blob' for Storage services\n"
-                        response_text += "• 'sql' or 'database' for SQL Database\n"
-                        response_text += "• 'kubernetes' or 'aks' for Azure Kubernetes Service"
-                    
-                    return [
-                        TextContent(
-                            type="text",
-                            text=response_text
-                        )
-                    ]
+                parts.append(f"   • {sku_name}\n")
+                parts.append(f"     Price: ${sku_data.min_price} per {sku_data.sample_unit}")
+                if region_count > 1:
+                    parts.append(f" (available in {region_count} regions)")
+                parts.append("\n")
+            parts.append("\n")
+        
+        return "".join(parts)
+    else:
+        # Format suggestions when no exact match
+        suggestions = result.get("suggestions", [])
+        original_search = result["original_search"]
+        
+        if suggestions:
+            parts = [
+                f"No exact match found for '{original_search}'\n\n",
+                "🔍 Did you mean one of these services?\n\n"
+            ]
             
-            elif name == "get_customer_discount":
-                result = await pricing_server.get_customer_discount(**arguments)
+            for i, suggestion in enumerate(suggestions, 1):
+                service_name = suggestion["service_name"]
+                match_reason = suggestion["match_reason"]
+                sample_items = suggestion["sample_items"]
                 
-                response_text = f"""Customer Discount Information
+                parts.append(f"{i}. {service_name}\n")
+                parts.append(f"   Reason: {match_reason}\n")
                 
+                if sample_items:
+                    parts.append("   Sample SKUs:\n")
+                    parts.extend(
+                        f"     • {item.get('skuName', 'Unknown')}: ${item.get('retailPrice', 0)} per {item.get('unitOfMeasure', 'Unknown')}\n"
+                        for item in sample_items[:3]
+                    )
+                parts.append("\n")
+            
+            parts.append("💡 Try using one of the exact service names above.")
+        else:
+            parts = [f"No matches found for '{original_search}'\n\n"]
+            # Same similarity threshold as the fuzzy search, so unrelated services are not offered
+            candidates = _SERVICE_NGRAM_INDEX.rank(original_search or "")
+            if candidates:
+                parts.append("💡 Closest known services:\n")
+                parts.append("\n".join(f"• {service}" for service, _ in candidates))
+            else:
+                parts.append(_NO_MATCH_HINT)
+        
+        return "".join(parts)
+
+async def _handle_customer_discount(arguments: dict, pretty: bool) -> List[TextContent]:
+    """Format the customer discount information."""
+    result = await pricing_server.get_customer_discount(**arguments)
+    
+    response_text = f"""Customer Discount Information
+        
 Customer ID: {result['customer_id']}
 Discount Type: {result['discount_type']}
 Discount Percentage: {result['discount_percentage']}%
@@ -1379,39 +2246,63 @@ Applicable Services: {result['applicable_services']}
 
 {result['note']}
 """
-                
-                return [
-                    TextContent(
-                        type="text",
-                        text=response_text
-                    )
-                ]
-            
-            else:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"Unknown tool: {name}"
-                    )
-                ]
+    
+    return _text_response(response_text)
+
+# Tool name -> response handler
+_TOOL_HANDLERS: Dict[str, Callable[[dict, bool], Awaitable[List[TextContent]]]] = {
+    "azure_price_search": _handle_price_search,
+    "azure_price_compare": _handle_price_compare,
+    "azure_cost_estimate": _handle_cost_estimate,
+    "azure_discover_skus": _handle_discover_skus,
+    "azure_sku_discovery": _handle_sku_discovery,
+    "get_customer_discount": _handle_customer_discount,
+}
+
+async def _dispatch_tool(name: str, arguments: dict) -> List[TextContent]:
+    """Run a tool and format its response."""
+    handler = _TOOL_HANDLERS.get(name)
+    if handler is None:
+        return _text_response(f"Unknown tool: {name}")
+    
+    # Handlers may inject defaults into their arguments; work on a copy so the
+    # caller's dict (also captured for background cache refresh) stays intact
+    arguments = dict(arguments or {})
+    # Output formatting option, not a pricing parameter
+    pretty = bool(arguments.pop("pretty", False))
+    return await handler(arguments, pretty)
+
+@server.call_tool()
+async def handle_call_tool(name: str, arguments: dict) -> list:
+    """Handle tool calls, serving repeated identical calls from the TTL cache."""
+    
+    try:
+        arguments = arguments or {}
+        key = _tool_cache_key(name, arguments)
+        result = await pricing_server.cached_call(key, lambda: _dispatch_tool(name, arguments))
+        return list(result)
     except Exception as e:
-        logger.error(f"Error handling tool call {name}: {e}")
-        return [
-            TextContent(
-                type="text",
-                text=f"Error: {str(e)}"
-            )
-        ]
+        logger.error("Error handling tool call %s: %s", name, e)
+        return _text_response(f"Error: {str(e)}")
 
 async def main():
     """Main entry point for the server."""
-    # Use stdio transport
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # Share one HTTP session for the lifetime of the server
+    async with pricing_server:
+        # Use stdio transport
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+
+def run() -> None:
+    """Run the server, using uvloop's faster event loop when it is installed."""
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
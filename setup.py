@@ -3,6 +3,7 @@
 Setup and run script for Azure Pricing MCP Server
 """
 
+import shutil
 import subprocess
 import sys
 import os
@@ -29,7 +30,12 @@ def install_dependencies():
     """Install required dependencies."""
     python_exe = get_python_executable()
     print("📦 Installing dependencies...")
-    subprocess.run([str(python_exe), "-m", "pip", "install", "-r", "requirements.txt"], check=True)
+    # Prefer uv when available; it installs much faster than pip on a cold cache
+    uv = shutil.which("uv")
+    if uv:
+        subprocess.run([uv, "pip", "install", "--python", str(python_exe), "-r", "requirements.txt"], check=True)
+    else:
+        subprocess.run([str(python_exe), "-m", "pip", "install", "-r", "requirements.txt"], check=True)
     print("✅ Dependencies installed")
 
 def run_server():
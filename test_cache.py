@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Offline tests for the response cache behind AzurePricingServer.cached_call.
+
+Covers request coalescing, takeover after a cancelled fetch, the negative TTL,
+derived entries expiring with their sources, LRU eviction, ETag revalidation
+and paging limits. No network access is needed: API requests go
+to a stub session.
+"""
+
+import asyncio
+import sys
+import time
+from contextlib import contextmanager
+
+import orjson
+
+sys.path.append('.')
+import azure_pricing_server
+from azure_pricing_server import AzurePricingServer, AZURE_PRICING_URL_USD
+
+@contextmanager
+def override(**settings):
+    """Temporarily replace module-level settings of azure_pricing_server."""
+    saved = {name: getattr(azure_pricing_server, name) for name in settings}
+    for name, value in settings.items():
+        setattr(azure_pricing_server, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(azure_pricing_server, name, value)
+
+class StubResponse:
+    """Minimal aiohttp response returning a fixed status, headers and JSON body."""
+
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = orjson.dumps(body) if body is not None else b""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        return self._body
+
+class StubSession:
+    """Session serving one price page with an ETag; honors If-None-Match with a 304."""
+
+    closed = False
+
+    def __init__(self, items, etag='"v1"'):
+        self.items = items
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, params=None, headers=None):
+        self.requests.append(headers or {})
+        if headers and headers.get("If-None-Match") == self.etag:
+            return StubResponse(304, headers={"ETag": self.etag})
+        return StubResponse(200, {"Items": self.items, "NextPageLink": None}, {"ETag": self.etag})
+
+class PagedSession:
+    """Session serving `total` numbered items in pages of `page_size`, following $skip."""
+
+    closed = False
+
+    def __init__(self, total, page_size=1000):
+        self.total = total
+        self.page_size = page_size
+        self.requests = []
+
+    def get(self, url, params=None, headers=None):
+        self.requests.append(params)
+        skip = int(params.get("$skip", 0))
+        items = [{"skuName": str(index)} for index in range(skip, min(skip + self.page_size, self.total))]
+        next_link = "next" if skip + self.page_size < self.total else None
+        return StubResponse(200, {"Items": items, "NextPageLink": next_link})
+
+def make_server(session=None):
+    """Create a server wired to a stub session, without background tasks."""
+    server = AzurePricingServer()
+    server.session = session
+    server._semaphore = asyncio.Semaphore(4)
+    return server
+
+def test_concurrent_misses_are_coalesced():
+    """Concurrent misses for one key share a single fetch."""
+    async def run():
+        server = make_server()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        results = await asyncio.gather(*(server.cached_call("key", fetch) for _ in range(5)))
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        # Later calls are served from the cache
+        assert await server.cached_call("key", fetch) is results[0]
+        assert len(calls) == 1
+
+    asyncio.run(run())
+
+def test_waiter_takes_over_when_leader_is_cancelled():
+    """A coalesced waiter re-runs the fetch when the fetching caller is cancelled."""
+    async def run():
+        server = make_server()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        leader = asyncio.create_task(server.cached_call("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(server.cached_call("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == 2
+        assert leader.cancelled()
+        assert not server._inflight
+
+    asyncio.run(run())
+
+def test_empty_results_use_negative_ttl():
+    """Empty API pages, and values derived from them, expire after the negative TTL."""
+    async def run():
+        with override(CACHE_TTL_SECONDS=900.0, CACHE_NEGATIVE_TTL_SECONDS=0.05):
+            server = make_server(StubSession(items=[]))
+
+            async def derived():
+                data = await server._make_request(AZURE_PRICING_URL_USD, {"$top": "1"})
+                return len(data["Items"])
+
+            assert await server.cached_call("tool", derived) == 0
+            assert "tool" in server._negative_keys
+            assert len(server._negative_keys) == 2
+            expires_at = server._cache["tool"][0]
+            assert expires_at - time.monotonic() <= 0.05
+
+            await asyncio.sleep(0.1)
+            assert server._cache_get("tool") is None
+            assert "tool" not in server._negative_keys
+
+        with override(CACHE_TTL_SECONDS=900.0, CACHE_NEGATIVE_TTL_SECONDS=0.05):
+            server = make_server(StubSession(items=[{"skuName": "D2s v3"}]))
+            await server._make_request(AZURE_PRICING_URL_USD, {"$top": "1"})
+            (expires_at, _), = server._cache.values()
+            assert expires_at - time.monotonic() > 800
+            assert not server._negative_keys
+
+    asyncio.run(run())
+
+def test_derived_entry_expires_with_its_source():
+    """A value built from a cached API response never outlives that response."""
+    async def run():
+        server = make_server(StubSession(items=[{"skuName": "D2s v3"}]))
+        params = {"$top": "1"}
+        await server._make_request(AZURE_PRICING_URL_USD, params)
+        key = server._cache_key(AZURE_PRICING_URL_USD, params)
+        # The API response is about to expire
+        source_expires_at = time.monotonic() + 1
+        server._cache[key] = (source_expires_at, server._cache[key][1])
+
+        async def derived():
+            data = await server._make_request(AZURE_PRICING_URL_USD, params)
+            return len(data["Items"])
+
+        assert await server.cached_call("tool", derived) == 1
+        assert server._cache["tool"][0] == source_expires_at
+
+        # Outer entries built from the derived one inherit the same bound
+        assert await server.cached_call("outer", lambda: server.cached_call("tool", derived)) == 1
+        assert server._cache["outer"][0] == source_expires_at
+
+    asyncio.run(run())
+
+def test_least_recently_used_entry_is_evicted():
+    """When the cache is full, the least recently used entry is evicted first."""
+    async def run():
+        with override(CACHE_MAX_ENTRIES=2):
+            server = make_server()
+
+            async def value(name):
+                return name
+
+            await server.cached_call("a", lambda: value("a"))
+            await server.cached_call("b", lambda: value("b"))
+            # Touch "a" so "b" becomes the least recently used entry
+            assert await server.cached_call("a", lambda: value("stale")) == "a"
+            await server.cached_call("c", lambda: value("c"))
+
+            assert list(server._cache) == ["a", "c"]
+            assert "b" not in server._cache_refreshers
+
+    asyncio.run(run())
+
+def test_not_modified_response_extends_ttl():
+    """A refresh revalidates with If-None-Match and a 304 keeps the cached data with a new expiry."""
+    async def run():
+        session = StubSession(items=[{"skuName": "D2s v3"}])
+        server = make_server(session)
+        params = {"$top": "1"}
+        first = await server._make_request(AZURE_PRICING_URL_USD, params)
+        key = server._cache_key(AZURE_PRICING_URL_USD, params)
+        assert server._etags[key] == '"v1"'
+
+        # Pretend the entry is about to expire, then refresh it
+        server._cache[key] = (time.monotonic() + 1, first)
+        await server._refresh_entry(key)
+
+        assert session.requests[-1] == {"If-None-Match": '"v1"'}
+        expires_at, data = server._cache[key]
+        assert data is first
+        assert expires_at - time.monotonic() > azure_pricing_server.CACHE_TTL_SECONDS - 5
+
+    asyncio.run(run())
+
+def test_paging_stops_at_the_last_page():
+    """A huge limit fetches pages in small batches and stops once a short page arrives."""
+    async def run():
+        session = PagedSession(total=2500)
+        server = make_server(session)
+        items, has_more = await server._fetch_items(AZURE_PRICING_URL_USD, {"$top": "1000"}, 1_000_000)
+
+        assert len(items) == 2500
+        assert not has_more
+        assert len(session.requests) == 1 + azure_pricing_server.PAGE_FETCH_BATCH
+
+    asyncio.run(run())
+
+def test_paging_is_capped():
+    """Paging never follows more than MAX_PAGES_PER_QUERY pages, however many exist."""
+    async def run():
+        session = PagedSession(total=10**9)
+        server = make_server(session)
+        items, has_more = await server._fetch_items(AZURE_PRICING_URL_USD, {"$top": "1000"}, 1_000_000)
+
+        assert len(session.requests) == azure_pricing_server.MAX_PAGES_PER_QUERY
+        assert len(items) == azure_pricing_server.MAX_PAGES_PER_QUERY * 1000
+        assert has_more
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
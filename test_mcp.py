@@ -68,17 +68,18 @@ async def test_edge_cases():
         {},  # Empty arguments
     ]
     
-    for i, args in enumerate(edge_cases, 1):
-        print(f"Edge case {i}: {args}")
-        try:
-            async with pricing_server:
+    # Share one HTTP session across all edge cases
+    async with pricing_server:
+        for i, args in enumerate(edge_cases, 1):
+            print(f"Edge case {i}: {args}")
+            try:
                 result = await pricing_server.search_azure_prices(**args)
                 print(f"  Success: {result['count']} items found")
-        except Exception as e:
-            print(f"  ERROR: {e}")
-            import traceback
-            traceback.print_exc()
-        print()
+            except Exception as e:
+                print(f"  ERROR: {e}")
+                import traceback
+                traceback.print_exc()
+            print()
 
 if __name__ == "__main__":
     asyncio.run(test_mcp_tool_call())
@@ -67,14 +67,16 @@ async def test_mcp_server():
         # This would normally run the server, but it's tricky to test this way
         # Let's just test the tool call directly instead
         
-        from azure_pricing_server import handle_call_tool
+        from azure_pricing_server import handle_call_tool, pricing_server
         
-        result = await handle_call_tool("azure_price_search", {
-            "service_name": "Virtual Machines",
-            "sku_name": "Standard_F16", 
-            "price_type": "Consumption",
-            "limit": 10
-        })
+        # handle_call_tool needs the HTTP session that main() opens for the server
+        async with pricing_server:
+            result = await handle_call_tool("azure_price_search", {
+                "service_name": "Virtual Machines",
+                "sku_name": "Standard_F16", 
+                "price_type": "Consumption",
+                "limit": 10
+            })
         
         print("Tool call result:")
         for item in result:
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Offline tests for resolving service hints to Azure service names.
+
+_resolve_service_name runs before any API request, so a wrong guess silently
+searches the wrong service; these cases need no network access.
+"""
+
+import sys
+
+sys.path.append('.')
+from azure_pricing_server import _resolve_service_name, _substring_matches
+
+def test_exact_aliases_and_service_names_resolve():
+    """Known aliases and canonical service names resolve regardless of case and spacing."""
+    assert _resolve_service_name("vm") == "Virtual Machines"
+    assert _resolve_service_name("  Virtual   Machines ") == "Virtual Machines"
+    assert _resolve_service_name("sql server") == "Azure SQL Database"
+    assert _resolve_service_name("serverless") == "Azure Functions"
+
+def test_unambiguous_prefix_resolves():
+    """A prefix that only leads to one service resolves to it."""
+    assert _resolve_service_name("kuber") == "Azure Kubernetes Service"
+    assert _resolve_service_name("func") == "Azure Functions"
+
+def test_prefix_inside_another_alias_does_not_resolve():
+    """A prefix of one alias that also occurs in another service's alias stays unresolved."""
+    assert _substring_matches("server") >= {"Azure Functions", "Azure SQL Database"}
+    assert _resolve_service_name("server") is None
+
+def test_short_and_unknown_hints_do_not_resolve():
+    """Prefixes shorter than min_prefix and unknown terms return None."""
+    assert _resolve_service_name("ku") is None
+    assert _resolve_service_name("xyz") is None
+    assert _resolve_service_name("") is None
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
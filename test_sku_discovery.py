@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Offline tests for azure_sku_discovery with a list of service hints.
+
+API requests go to the stub session from test_cache.py, so no network access is needed.
+"""
+
+import asyncio
+import sys
+
+sys.path.append('.')
+from azure_pricing_server import _dispatch_tool
+from test_cache import StubSession, make_server
+
+def price_item(service_name, sku_name):
+    """Build one price row of the given service."""
+    return {
+        "serviceName": service_name,
+        "productName": f"{service_name} Product",
+        "skuName": sku_name,
+        "armSkuName": sku_name,
+        "armRegionName": "eastus",
+        "retailPrice": 0.1,
+        "unitOfMeasure": "1 Hour",
+    }
+
+def test_resolved_hints_share_one_query():
+    """Hints that resolve to known services are discovered with a single API request."""
+    async def run():
+        session = StubSession(items=[
+            price_item("Virtual Machines", "D2s v3"),
+            price_item("Azure Kubernetes Service", "Standard"),
+        ])
+        server = make_server(session)
+        results = await server.discover_many_service_skus(["vm", "kuber"])
+
+        assert list(results) == ["vm", "kuber"]
+        assert results["vm"]["service_found"] == "Virtual Machines"
+        assert list(results["vm"]["skus"]) == ["D2s v3"]
+        assert results["kuber"]["service_found"] == "Azure Kubernetes Service"
+        assert len(session.requests) == 1
+
+    asyncio.run(run())
+
+def test_invalid_hint_lists_are_rejected():
+    """Empty lists and lists with non-string elements return an error instead of querying."""
+    async def run():
+        for service_hint in ([], ["vm", 3], [None]):
+            response = await _dispatch_tool("azure_sku_discovery", {"service_hint": service_hint})
+            assert len(response) == 1
+            assert response[0].text.startswith("Error: service_hint must be")
+
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")